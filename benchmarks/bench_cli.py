@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the headless CLI (python -m core).
+
+Each command runs once under `python -X importtime` inside the fake desktop
+of bench_scripts.py. The cumulative import time of the core package is
+compared to a budget, and any PyQt module on the import path is an error.
+
+    python3 benchmarks/bench_cli.py
+    python3 benchmarks/bench_cli.py --budget 40
+
+Exits with status 1 when a command imports Qt or goes over budget.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_scripts import ROOT, FakeDesktop, generate_scripts
+
+COMMANDS = [
+    ['--help'],
+    ['generate'],
+    ['cycle', 'next'],
+    ['rename', '--no-mute'],
+    ['reorganize'],
+    ['profile', 'list'],
+    ['workspaces'],
+]
+
+
+def import_profile(desk, command):
+    """Return (ms spent importing core.*, modules imported from PyQt*)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'core', *command],
+                            cwd=ROOT, env=desk.env, capture_output=True, text=True)
+    core_us = 0
+    qt = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip().startswith('PyQt'):
+            qt.append(name.strip())
+        # Top-level entries only (one space after the bar): nested imports are
+        # already part of their parent's cumulative time
+        if name.startswith(' core'):
+            core_us += int(cumulative)
+    return core_us / 1000, qt
+
+
+def wall_time(desk, command, runs):
+    times = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'core', *command], cwd=ROOT, env=desk.env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=60.0, help="max core import time per command (ms)")
+    parser.add_argument('--runs', type=int, default=5, help="wall-time samples per command")
+    args = parser.parse_args(argv)
+
+    desk = FakeDesktop()
+    try:
+        generate_scripts(desk)
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        interpreter = (time.perf_counter() - begin) * 1000
+
+        failed = False
+        print(f"{'Command':<24} {'imports':>9} {'wall p50':>9}")
+        for command in COMMANDS:
+            imports_ms, qt = import_profile(desk, command)
+            wall_ms = wall_time(desk, command, args.runs)
+            status = ''
+            if qt:
+                status = f"  imports {', '.join(qt)}"
+                failed = True
+            elif imports_ms > args.budget:
+                status = f"  OVER BUDGET ({args.budget:.0f} ms)"
+                failed = True
+            print(f"{' '.join(command):<24} {imports_ms:7.1f}ms {wall_ms:7.1f}ms{status}")
+        print(f"{'(python -c pass)':<24} {'':>9} {interpreter:7.1f}ms")
+    finally:
+        desk.cleanup()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
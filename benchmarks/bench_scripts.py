@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Keypress-to-focus latency benchmark for the generated scripts.
+
+Stub wmctrl/xdotool/xprop/pactl executables backed by a small state directory
+stand in for the X server, with a configurable number of fake Dofus windows.
+Common tools the scripts fork (awk, grep, cut, ...) are wrapped so that every
+process spawned by a script is counted.
+
+    python3 benchmarks/bench_scripts.py                 # run and compare to baseline.json
+    python3 benchmarks/bench_scripts.py --daemon        # cycle scripts through the daemon
+    python3 benchmarks/bench_scripts.py --update-baseline
+
+Exits with status 1 when a script spawns more processes than its baseline or
+its p95 latency grows beyond the allowed tolerance.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+CLASS_NAMES = ['Feca', 'Cra', 'Enu', 'Panda', 'Sadi', 'Iop', 'Eni', 'Osa',
+               'Sram', 'Xelor', 'Ecaflip', 'Sacrieur', 'Steamer', 'Eliotrope', 'Huppermage', 'Ouginak']
+
+# Tools wrapped to count spawns; they log and exec the real binary
+COUNTED_TOOLS = ['awk', 'grep', 'cut', 'cat', 'sleep', 'sed', 'head', 'tr', 'flock', 'python3']
+
+STUB_HEADER = """#!/bin/bash
+echo {name} >> "$FAKE_WM_LOG"
+STATE="$FAKE_WM_STATE"
+WINDOWS="$STATE/windows"
+# Replace a property file in one step: readers never see it empty
+put() {
+    printf '%s\\n' "$2" > "$STATE/$1.$$"
+    command -p mv -f "$STATE/$1.$$" "$STATE/$1"
+}
+"""
+
+# Window table: one "wid desktop pid title" line per client
+WMCTRL_STUB = STUB_HEADER + r"""
+set_field() {
+    local target="$1" field="$2" value="$3" out="" w ws pid title
+    # Like the X server, apply concurrent requests one at a time; readers see the
+    # old or the new table, never half of it (command -p: not counted as spawns)
+    exec 8> "$WINDOWS.lock"
+    command -p flock 8
+    while read -r w ws pid title; do
+        if (( w == target )); then
+            case "$field" in
+                desktop) ws="$value" ;;
+                title) title="$value" ;;
+            esac
+        fi
+        out+="$w $ws $pid $title"$'\n'
+    done < "$WINDOWS"
+    printf '%s' "$out" > "$WINDOWS.$$"
+    command -p mv -f "$WINDOWS.$$" "$WINDOWS"
+}
+
+case "$1" in
+    -l)
+        while read -r w ws pid title; do printf '%s %2s fakehost %s\n' "$w" "$ws" "$title"; done < "$WINDOWS" ;;
+    -lp)
+        while read -r w ws pid title; do printf '%s %2s %s fakehost %s\n' "$w" "$ws" "$pid" "$title"; done < "$WINDOWS" ;;
+    -d)
+        read -r cur < "$STATE/current"; read -r count < "$STATE/count"
+        for ((i = 0; i < count; i++)); do
+            mark='-'; (( i == cur )) && mark='*'
+            printf '%d  %s DG: 1920x1080  VP: 0,0  WA: 0,0 1920x1040  Workspace %d\n' "$i" "$mark" "$((i + 1))"
+        done ;;
+    -s)
+        put current "$2" ;;
+    -a)
+        while read -r w ws pid title; do
+            if [[ "$title" == *"$2"* ]]; then put active "$w"; exit 0; fi
+        done < "$WINDOWS"
+        exit 1 ;;
+    -ia)
+        while read -r w ws pid title; do
+            if (( w == $2 )); then put active "$w"; exit 0; fi
+        done < "$WINDOWS"
+        exit 1 ;;
+    -ir)
+        case "$3" in
+            -N) set_field "$2" title "$4" ;;
+            -t) set_field "$2" desktop "$4" ;;
+        esac ;;
+esac
+"""
+
+XPROP_STUB = STUB_HEADER + r"""
+if [[ "$1" == "-root" ]]; then
+    read -r active < "$STATE/active"
+    echo "_NET_ACTIVE_WINDOW(WINDOW): window id # $active"
+    exit 0
+fi
+while read -r w ws pid title; do
+    if (( w == $2 )); then
+        case "$3" in
+            _NET_WM_DESKTOP) echo "_NET_WM_DESKTOP(CARDINAL) = $ws" ;;
+            _NET_WM_PID) echo "_NET_WM_PID(CARDINAL) = $pid" ;;
+        esac
+        exit 0
+    fi
+done < "$WINDOWS"
+exit 1
+"""
+
+XDOTOOL_STUB = STUB_HEADER + r"""
+case "$1" in
+    getactivewindow) read -r active < "$STATE/active"; echo $(( active )) ;;
+    windowactivate) printf -v wid '0x%08x' "$2"; put active "$wid" ;;
+    windowraise) [[ "$3" == windowfocus ]] && printf -v wid '0x%08x' "$4" && put active "$wid" ;;
+esac
+"""
+
+PACTL_STUB = STUB_HEADER + r"""
+case "$1" in
+    list)
+        id=100
+        while read -r w ws pid title; do
+            printf 'Sink Input #%d\n\tMute: no\n\tProperties:\n\t\tapplication.process.id = "%s"\n' "$id" "$pid"
+            id=$((id + 1))
+        done < "$WINDOWS" ;;
+esac
+"""
+
+SHIM = """#!/bin/bash
+echo {name} >> "$FAKE_WM_LOG"
+exec {real} "$@"
+"""
+
+
+class FakeDesktop:
+    """Sandbox with stub tools on PATH and a fake window table."""
+
+    def __init__(self, windows=8, desktops=2):
+        self.root = Path(tempfile.mkdtemp(prefix="dofus_bench_"))
+        self.bin = self.root / "bin"
+        self.state = self.root / "state"
+        self.config = self.root / "config"
+        self.runtime = self.root / "run"
+        self.log = self.root / "spawns.log"
+        for path in (self.bin, self.state, self.config, self.runtime):
+            path.mkdir()
+        self.classes = [CLASS_NAMES[i % len(CLASS_NAMES)] + ('' if i < len(CLASS_NAMES) else str(i))
+                        for i in range(windows)]
+        self.desktops = desktops
+        self._install_tools()
+        self.reset()
+
+        self.env = dict(os.environ)
+        self.env.update({
+            'PATH': f"{self.bin}:{os.environ.get('PATH', '')}",
+            'FAKE_WM_STATE': str(self.state),
+            'FAKE_WM_LOG': str(self.log),
+            'DOFUS_WM_CONFIG_DIR': str(self.config),
+            'DOFUS_WM_STATE_FILE': str(self.runtime / "window_index"),
+            'DOFUS_WM_BACKEND': 'command',
+            'XDG_RUNTIME_DIR': str(self.runtime),
+            'LC_ALL': 'C',
+        })
+
+    def _install_tools(self):
+        stubs = {'wmctrl': WMCTRL_STUB, 'xprop': XPROP_STUB, 'xdotool': XDOTOOL_STUB, 'pactl': PACTL_STUB}
+        for name, body in stubs.items():
+            self._write(name, body.replace('{name}', name))
+        for name in COUNTED_TOOLS:
+            real = shutil.which(name)
+            if real:
+                self._write(name, SHIM.format(name=name, real=real))
+
+    def _write(self, name, body):
+        path = self.bin / name
+        path.write_text(body)
+        path.chmod(0o755)
+
+    def reset(self):
+        """Windows already renamed, all on the first desktop"""
+        lines = [f"0x{0x0a000001 + i:08x} 0 {4000 + i} Dofus-{name}"
+                 for i, name in enumerate(self.classes)]
+        (self.state / "windows").write_text('\n'.join(lines) + '\n')
+        (self.state / "current").write_text("0\n")
+        (self.state / "count").write_text(f"{self.desktops}\n")
+        (self.state / "active").write_text("0x0a000001\n")
+
+    def focus(self):
+        """(active window, current desktop): what a press is expected to change"""
+        return tuple((self.state / name).read_text() for name in ('active', 'current'))
+
+    def spawns(self):
+        try:
+            return len(self.log.read_text().splitlines())
+        except FileNotFoundError:
+            return 0
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def generate_scripts(desk):
+    """Generate every script inside the sandbox config dir"""
+    code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from core import scripts\n"
+        "classes = %r\n"
+        "scripts.generate_rename_script(classes)\n"
+        "scripts.generate_reorganize_script(classes)\n"
+        "scripts.generate_cycle_forward(classes)\n"
+        "scripts.generate_cycle_backward(classes)\n"
+        "scripts.generate_toggle_workspace()\n"
+        "scripts.generate_space_cycle_forward()\n"
+        "scripts.generate_click_cycle()\n"
+    ) % (str(ROOT), desk.classes)
+    subprocess.run([sys.executable, '-c', code], env=desk.env, check=True)
+    (desk.config / "config.json").write_text(json.dumps({'class_ini': desk.classes}))
+    return desk.config / "scripts"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def bench_script(desk, path, iterations, await_focus=False, settle=1.0):
+    """
+    Run one script repeatedly; return latency percentiles (ms) and spawns per run.
+    A press queued on the daemon's FIFO is applied after the script exits:
+    with await_focus, each run waits for the focus to move so that the
+    daemon's own spawns are counted in the run that caused them.
+    """
+    desk.reset()
+    timings = []
+    spawns = []
+    for _ in range(iterations):
+        desk.log.write_text("")
+        before = desk.focus()
+        start = time.perf_counter()
+        subprocess.run([str(path)], env=desk.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+        deadline = time.monotonic() + settle
+        while await_focus and desk.focus() == before and time.monotonic() < deadline:
+            time.sleep(0.002)
+        # +1 for the bash interpreter running the script itself
+        spawns.append(desk.spawns() + 1)
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'spawns': max(spawns),
+    }
+
+
+def read_cycle_index(desk):
+    try:
+        return int((desk.runtime / "window_index").read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def bench_burst(desk, path, presses, settle=2.0):
+    """
+    Start presses instances of a cycle script at once, like a held key.
+    Every press must count: the cycle index has to end exactly presses
+    accounts further. Returns the time until it got there and the presses lost.
+    """
+    desk.reset()
+    total = len(desk.classes)
+    expected = (read_cycle_index(desk) + presses) % total
+    start = time.perf_counter()
+    procs = [subprocess.Popen([str(path)], env=desk.env, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL) for _ in range(presses)]
+    for proc in procs:
+        proc.wait()
+    # Presses queued to the daemon are applied asynchronously
+    deadline = time.monotonic() + settle
+    while read_cycle_index(desk) != expected and time.monotonic() < deadline:
+        time.sleep(0.005)
+    elapsed = (time.perf_counter() - start) * 1000
+    return {
+        'presses': presses,
+        'elapsed_ms': round(elapsed, 2),
+        'lost': (expected - read_cycle_index(desk)) % total,
+    }
+
+
+def start_daemon(desk):
+    proc = subprocess.Popen([sys.executable, str(ROOT / "main.py"), '--daemon'], env=desk.env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Written last, once the socket and the FIFO are ready
+    pid_path = desk.runtime / "dofus_window_manager.pid"
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if pid_path.exists():
+            return proc
+        time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError("daemon did not start")
+
+
+def stop_daemon(desk, proc):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(desk.runtime / "dofus_window_manager.sock"))
+            sock.sendall(b"quit\n")
+            sock.recv(64)
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+SCRIPTS = [
+    'cycle_forward.sh', 'cycle_backward.sh', 'space_cycle_forward.sh', 'click_cycle_forward.sh',
+    'rename_windows.sh', 'reorganize_windows.sh', 'toggle_workspace.sh',
+]
+# Handed to the daemon when it runs: the focus moves after the script exits
+PRESS_SCRIPTS = {
+    'cycle_forward.sh', 'cycle_backward.sh', 'space_cycle_forward.sh', 'click_cycle_forward.sh',
+    'toggle_workspace.sh',
+}
+
+
+def run(windows, iterations, daemon=False, only=None, burst=0):
+    desk = FakeDesktop(windows)
+    proc = None
+    try:
+        script_dir = generate_scripts(desk)
+        if daemon:
+            proc = start_daemon(desk)
+        results = {}
+        for name in SCRIPTS:
+            if only and name not in only:
+                continue
+            results[name] = bench_script(desk, script_dir / name, iterations,
+                                         daemon and name in PRESS_SCRIPTS)
+        bursts = {}
+        if burst:
+            bursts['cycle_forward.sh'] = bench_burst(desk, script_dir / 'cycle_forward.sh', burst)
+        return results, bursts
+    finally:
+        if proc:
+            stop_daemon(desk, proc)
+        desk.cleanup()
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages"""
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if res['spawns'] > base['spawns']:
+            failures.append(f"{name}: {res['spawns']} spawns > baseline {base['spawns']}")
+        limit = base['p95_ms'] * (1 + tolerance)
+        if res['p95_ms'] > limit:
+            failures.append(f"{name}: p95 {res['p95_ms']:.1f} ms > {limit:.1f} ms "
+                            f"(baseline {base['p95_ms']:.1f} ms +{tolerance:.0%})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--windows', type=int, default=8, help="number of fake Dofus windows")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--daemon', action='store_true', help="run the cycle daemon during the benchmark")
+    parser.add_argument('--script', action='append', help="only benchmark this script (repeatable)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed p95 growth (0.5 = +50%%)")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--json', action='store_true', help="print raw results as JSON")
+    parser.add_argument('--burst', type=int, default=10,
+                        help="concurrent cycle presses fired at once (0 to skip)")
+    args = parser.parse_args(argv)
+
+    results, bursts = run(args.windows, args.iterations, args.daemon, args.script, args.burst)
+    key = f"{args.windows}_windows{'_daemon' if args.daemon else ''}"
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'script':<26}{'p50':>9}{'p95':>9}{'p99':>9}{'spawns':>8}")
+        for name, res in results.items():
+            print(f"{name:<26}{res['p50_ms']:>7.1f}ms{res['p95_ms']:>7.1f}ms{res['p99_ms']:>7.1f}ms{res['spawns']:>8}")
+        for name, res in bursts.items():
+            print(f"{name} x{res['presses']} at once: {res['elapsed_ms']:.1f} ms, "
+                  f"{res['lost']} press(es) lost")
+
+    try:
+        baselines = json.loads(args.baseline.read_text())
+    except (OSError, ValueError):
+        baselines = {}
+
+    if args.update_baseline:
+        baselines.setdefault(key, {}).update(results)
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline '{key}' written to {args.baseline}")
+        return 0
+
+    failures = compare(results, baselines.get(key, {}), args.tolerance)
+    failures += [f"{name}: {res['lost']} of {res['presses']} concurrent presses lost"
+                 for name, res in bursts.items() if res['lost']]
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
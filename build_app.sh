@@ -22,6 +22,7 @@ pyinstaller \
     --windowed \
     --add-data "${PROJECT_DIR}/core:core" \
     --add-data "${PROJECT_DIR}/ui:ui" \
+    --add-data "${PROJECT_DIR}/extensions:extensions" \
     --collect-all PyQt6 \
     --distpath "${PROJECT_DIR}/dist" \
     --workpath "${PROJECT_DIR}/build" \
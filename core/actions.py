@@ -0,0 +1,134 @@
+from .audio import AudioMuter
+from .backend import get_backend
+from .displays import display_paths
+from .executor import DEFAULT_JOBS, ParallelStats, run_parallel, workers_for
+from .identity import assign_names, load_identities, save_identities, window_identity
+from .utils import dofus_class
+
+
+def rename_windows(class_list, index, backend=None, muter=None, mute=True, progress=None,
+                   cancelled=None, desktop=None, reset=False, jobs=DEFAULT_JOBS, identity_file=None):
+    """
+    In-process equivalent of rename_windows.sh, driven by the window index.
+    Each Dofus client keeps the class remembered for its process (see
+    identity.assign_names), so only new clients and drifted titles are renamed;
+    reset=True names them after class_list in client-list order instead.
+    Every client except the leader (class_list[0]) is then muted in one pactl batch.
+    With a desktop, only the clients on that desktop are renamed and muted.
+    Identities are kept per X display (identity_file defaults to the index's).
+    Renames and pactl calls run up to jobs at a time; the log ends with the
+    wall time this saved over running them one by one.
+    progress(line) receives each log line; the run stops once cancelled() is True.
+    Returns a list of human readable log lines.
+    """
+    backend = backend or get_backend()
+    cancelled = cancelled or (lambda: False)
+    if not index.live:
+        index.refresh()
+
+    log = _Log(progress)
+    windows = index.game_windows(desktop)
+    if not windows:
+        if desktop is not None:
+            return [f"No Dofus windows on workspace {desktop}."]
+        return ["No Dofus windows found."]
+
+    # Forget the clients that are gone, on any desktop of this display
+    identity_file = identity_file or display_paths(index.display_name).identity_file
+    live = {window_identity(win) for win in index.game_windows()}
+    known = {identity: name for identity, name in load_identities(identity_file).items() if identity in live}
+    assigned, identities = assign_names(windows, class_list, known, reset)
+
+    names = {}
+    renames = []
+    for win, name, identity in zip(windows, assigned, identities):
+        if name is None:
+            log.append("Not enough name in CLASS_LOGIN to rename all windows.")
+            break
+        names[win.wid] = name
+        if win.title == f"Dofus-{name}":
+            known[identity] = name
+        else:
+            renames.append((win.wid, f"Dofus-{name}", identity, name))
+
+    # Windows are independent: rename them concurrently, log in client-list order
+    def rename_job(wid, title):
+        if cancelled():
+            return False
+        return backend.rename(wid, title)
+
+    stats = ParallelStats()
+    results = run_parallel([lambda r=rename: rename_job(*r[:2]) for rename in renames],
+                           workers_for(backend, jobs), stats)
+    for (wid, title, identity, name), done in zip(renames, results):
+        if done is True:
+            log.append(f"Windows renamed : {title}")
+            known[identity] = name
+        else:
+            # The window keeps its old title: do not claim the name for it
+            names.pop(wid, None)
+            if not cancelled():
+                log.append(f"Rename failed : {title}")
+    try:
+        save_identities(known, identity_file)
+    except OSError:
+        pass
+    if cancelled():
+        log.append("Rename cancelled.")
+        return log
+
+    if mute and class_list:
+        log.extend(mute_followers(class_list[0], windows, names, muter or AudioMuter(jobs=jobs), stats))
+    if stats.workers > 1:
+        log.append(f"Parallel: {stats.format()}")
+    return log
+
+
+class _Log(list):
+    """List of log lines that also forwards each line to a progress callback"""
+
+    def __init__(self, progress=None):
+        super().__init__()
+        self.progress = progress
+
+    def append(self, line):
+        super().append(line)
+        if self.progress:
+            self.progress(line)
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+
+def mute_followers(leader, windows, names, muter=None, stats=None):
+    """Mute every client but the leader, unmute the leader, using one snapshot"""
+    muter = muter or AudioMuter()
+    mute_pids = set()
+    unmute_pids = set()
+    for win in windows:
+        if not win.pid:
+            continue
+        name = names.get(win.wid) or dofus_class(win.title)
+        if name == leader:
+            unmute_pids.add(win.pid)
+        elif name:
+            mute_pids.add(win.pid)
+    changes = muter.apply(mute_pids - unmute_pids, unmute_pids, stats=stats)
+    return [f"Windows {'muted' if muted else 'unmuted'} : PID {pid}, Sink {input_id}"
+            for input_id, pid, muted in changes]
+
+
+def follower_filter(index, get_class_list):
+    """
+    Predicate for AudioMuter.watch(): True for PIDs of non-leader Dofus clients.
+    get_class_list(desktop) returns the initiative order used on that desktop.
+    """
+    def should_mute(pid):
+        for win in index.windows_for_pid(pid):
+            name = dofus_class(win.title)
+            class_list = get_class_list(win.desktop)
+            if name and class_list and name != class_list[0]:
+                return True
+        return False
+    return should_mute
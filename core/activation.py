@@ -0,0 +1,136 @@
+import statistics
+import time
+
+from .backend import get_backend
+from .utils import run_cmd
+
+DEFAULT_METHOD = 'net_active'
+CONFIRM_TIMEOUT = 0.5
+
+
+def _net_active(backend, wid):
+    return backend.activate(wid)
+
+
+def _xdotool(backend, wid):
+    return run_cmd(['xdotool', 'windowactivate', str(wid)], timeout=2, env=backend.env)[2] == 0
+
+
+def _raise_focus(backend, wid):
+    return backend.raise_focus(wid)
+
+
+# Every strategy targets a window id, never a title search
+STRATEGIES = {
+    'net_active': _net_active,
+    'xdotool': _xdotool,
+    'raise_focus': _raise_focus,
+}
+
+# Same strategies for the generated bash scripts ($WIN_ID holds the window id)
+SCRIPT_COMMANDS = {
+    'net_active': 'wmctrl -ia "$WIN_ID"',
+    'xdotool': 'xdotool windowactivate "$WIN_ID"',
+    'raise_focus': 'xdotool windowraise "$WIN_ID" windowfocus "$WIN_ID"',
+}
+
+
+def configured_method(config):
+    """
+    Activation method from config.json. {'method': 'auto'} uses the winner of
+    the last probe (stored as 'selected'); anything unknown means the default.
+    """
+    settings = config.get('activation') or {}
+    method = settings.get('method')
+    if method == 'auto':
+        method = settings.get('selected')
+    return method if method in STRATEGIES else DEFAULT_METHOD
+
+
+def record_probe(config, best, results):
+    """Store a probe outcome in a config dict (the caller saves it)"""
+    settings = dict(config.get('activation') or {})
+    if best:
+        settings['selected'] = best
+        if settings.get('method') != 'auto':
+            settings['method'] = best
+    settings['timings'] = results
+    settings['probed_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    config['activation'] = settings
+    return settings
+
+
+def wait_active(backend, wid, timeout=CONFIRM_TIMEOUT, index=None):
+    """Block until the WM reports wid as _NET_ACTIVE_WINDOW; True if confirmed"""
+    if index is not None and index.live:
+        return index.wait_for(lambda idx: idx.active == wid, timeout)
+    deadline = time.monotonic() + timeout
+    delay = 0.002
+    while True:
+        if backend.active_window() == wid:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.02)
+
+
+class Activator:
+    """Focus a window with one strategy; a failed call falls back to _NET_ACTIVE_WINDOW"""
+
+    def __init__(self, backend=None, method=DEFAULT_METHOD):
+        self.backend = backend or get_backend()
+        self.method = method if method in STRATEGIES else DEFAULT_METHOD
+
+    def __call__(self, wid):
+        try:
+            if STRATEGIES[self.method](self.backend, wid):
+                return True
+        except Exception:
+            pass
+        return self.method != DEFAULT_METHOD and STRATEGIES[DEFAULT_METHOD](self.backend, wid)
+
+
+def probe(windows, backend=None, index=None, rounds=3, timeout=CONFIRM_TIMEOUT):
+    """
+    Time every strategy on the current WM by focusing windows (wids, at least
+    two) in turn, from request to confirmed _NET_ACTIVE_WINDOW. Returns
+    (best method or None, {method: {'median_ms', 'confirmed', 'tries'}}).
+    The window that was active before is focused again at the end.
+    """
+    backend = backend or get_backend()
+    windows = list(windows)
+    if len(windows) < 2:
+        return None, {}
+    previous = backend.active_window()
+    results = {}
+    turn = 0
+    for name, strategy in STRATEGIES.items():
+        times = []
+        tries = rounds * 2
+        for _ in range(tries):
+            # Never target the window that already has the focus
+            wid = windows[turn % len(windows)]
+            if wid == backend.active_window():
+                turn += 1
+                wid = windows[turn % len(windows)]
+            turn += 1
+            begin = time.monotonic()
+            try:
+                requested = strategy(backend, wid)
+            except Exception:
+                requested = False
+            if requested and wait_active(backend, wid, timeout, index):
+                times.append((time.monotonic() - begin) * 1000)
+        results[name] = {
+            'median_ms': round(statistics.median(times), 2) if times else None,
+            'confirmed': len(times),
+            'tries': tries,
+        }
+    if previous:
+        backend.activate(previous)
+
+    reliable = [name for name, r in results.items() if r['confirmed'] == r['tries']]
+    best = min(reliable, key=lambda name: results[name]['median_ms']) if reliable else None
+    return best, results
@@ -0,0 +1,126 @@
+import os
+import re
+import subprocess
+import threading
+from collections import namedtuple
+
+from .executor import DEFAULT_JOBS, run_parallel
+
+SinkInput = namedtuple('SinkInput', 'id pid muted')
+
+SINK_INPUT_HEADER = re.compile(r'^Sink Input #(\d+)')
+SINK_INPUT_PID = re.compile(r'application\.process\.id = "(\d+)"')
+SINK_INPUT_MUTE = re.compile(r'^\s*Mute: (yes|no)')
+SUBSCRIBE_NEW = re.compile(r"Event 'new' on sink-input #(\d+)")
+
+# pactl output is localized; the parser expects the C locale
+PACTL_ENV = dict(os.environ, LC_ALL='C')
+
+
+def parse_sink_inputs(text):
+    """Parse `pactl list sink-inputs` output into a list of SinkInput"""
+    inputs = []
+    current = None
+    for line in text.splitlines():
+        match = SINK_INPUT_HEADER.match(line)
+        if match:
+            if current:
+                inputs.append(SinkInput(**current))
+            current = {'id': int(match.group(1)), 'pid': None, 'muted': False}
+            continue
+        if current is None:
+            continue
+        match = SINK_INPUT_MUTE.match(line)
+        if match:
+            current['muted'] = match.group(1) == 'yes'
+            continue
+        match = SINK_INPUT_PID.search(line)
+        if match:
+            current['pid'] = int(match.group(1))
+    if current:
+        inputs.append(SinkInput(**current))
+    return inputs
+
+
+class AudioMuter:
+    """Mute/unmute Dofus clients by PID from a single sink-input snapshot."""
+
+    def __init__(self, pactl='pactl', jobs=DEFAULT_JOBS):
+        self.pactl = os.environ.get('DOFUS_PACTL', pactl)
+        self.jobs = jobs
+        self._watcher = None
+
+    def snapshot(self):
+        """Return {pid: [SinkInput, ...]} from one `pactl list sink-inputs`"""
+        try:
+            result = subprocess.run([self.pactl, 'list', 'sink-inputs'], capture_output=True,
+                                    text=True, timeout=5, env=PACTL_ENV)
+        except Exception:
+            return {}
+        if result.returncode != 0:
+            return {}
+        by_pid = {}
+        for entry in parse_sink_inputs(result.stdout):
+            if entry.pid is not None:
+                by_pid.setdefault(entry.pid, []).append(entry)
+        return by_pid
+
+    def apply(self, mute_pids=(), unmute_pids=(), snapshot=None, stats=None):
+        """
+        Bring every sink-input of the given PIDs to the wanted state in one batch.
+        Inputs already in that state are skipped; up to self.jobs pactl calls run
+        at once (timings go to stats, a ParallelStats).
+        Returns the list of (sink_input_id, pid, muted) changes that succeeded.
+        """
+        by_pid = snapshot if snapshot is not None else self.snapshot()
+        wanted = {pid: True for pid in mute_pids}
+        wanted.update({pid: False for pid in unmute_pids})
+
+        changes = []
+        for pid, mute in wanted.items():
+            for entry in by_pid.get(pid, ()):
+                if entry.muted != mute:
+                    changes.append((entry.id, pid, mute))
+        return self._set_mute(changes, stats)
+
+    def _set_mute(self, changes, stats=None):
+        def job(input_id, mute):
+            cmd = [self.pactl, 'set-sink-input-mute', str(input_id), '1' if mute else '0']
+            return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  timeout=5).returncode == 0
+
+        results = run_parallel([lambda c=change: job(c[0], c[2]) for change in changes], self.jobs, stats)
+        return [change for change, ok in zip(changes, results) if ok is True]
+
+    # === SUBSCRIBE MODE ===
+    def watch(self, should_mute):
+        """
+        Mute new sink-inputs as soon as PulseAudio/PipeWire announces them.
+        should_mute(pid) decides; it runs on the watcher thread.
+        """
+        if self._watcher is not None:
+            return
+        try:
+            proc = subprocess.Popen([self.pactl, 'subscribe'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, text=True, env=PACTL_ENV)
+        except OSError:
+            return
+        self._watcher = proc
+        threading.Thread(target=self._watch_loop, args=(proc, should_mute),
+                         name='audio-watch', daemon=True).start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.terminate()
+            self._watcher = None
+
+    def _watch_loop(self, proc, should_mute):
+        for line in proc.stdout:
+            match = SUBSCRIBE_NEW.search(line)
+            if not match:
+                continue
+            input_id = int(match.group(1))
+            for entries in self.snapshot().values():
+                for entry in entries:
+                    if entry.id == input_id and not entry.muted and should_mute(entry.pid):
+                        self._set_mute([(entry.id, entry.pid, True)])
@@ -0,0 +1,375 @@
+import os
+from collections import namedtuple
+
+from .utils import run_cmd, dofus_class
+
+try:
+    import Xlib.threaded  # noqa: F401 - makes the shared connection thread-safe
+    from Xlib import X, Xatom, display as xdisplay, error as xerror
+    from Xlib.protocol import event as xevent
+    HAS_XLIB = True
+except ImportError:
+    HAS_XLIB = False
+
+Window = namedtuple('Window', 'wid desktop pid title')
+
+ALL_DESKTOPS = 0xFFFFFFFF
+SOURCE_PAGER = 2
+
+
+class WindowBackend:
+    """Common interface of the window-system backends."""
+
+    name = 'base'
+    # True when calls share one connection and gain nothing from threads
+    serial = False
+    # Environment for helper commands (xdotool...): DISPLAY of this backend
+    env = None
+
+    def list_windows(self):
+        """Return a Window tuple for every managed client"""
+        raise NotImplementedError
+
+    def get_workspaces(self):
+        """Return list of (num, name) tuples"""
+        raise NotImplementedError
+
+    def current_desktop(self):
+        raise NotImplementedError
+
+    def desktop_layout(self):
+        """Return ([desktop names], current desktop) in as few round trips as possible"""
+        return [name for _, name in self.get_workspaces()], self.current_desktop()
+
+    def active_window(self):
+        raise NotImplementedError
+
+    def rename(self, wid, title):
+        raise NotImplementedError
+
+    def activate(self, wid):
+        raise NotImplementedError
+
+    def raise_focus(self, wid):
+        """Raise wid and give it the input focus directly, bypassing _NET_ACTIVE_WINDOW"""
+        raise NotImplementedError
+
+    def switch_desktop(self, num):
+        raise NotImplementedError
+
+    def move_to_desktop(self, wid, num):
+        raise NotImplementedError
+
+    def unstick(self, wid):
+        raise NotImplementedError
+
+    def supports(self, hint):
+        """True if the WM lists hint (e.g. '_NET_RESTACK_WINDOW') in _NET_SUPPORTED"""
+        return False
+
+    def wm_name(self):
+        return None
+
+    def stacking_order(self):
+        """Client ids from bottom to top"""
+        return [win.wid for win in self.list_windows()]
+
+    def restack(self, wid, sibling, above=True):
+        """Place wid directly above (or below) sibling; False if unsupported"""
+        return False
+
+    def get_window(self, wid):
+        for win in self.list_windows():
+            if win.wid == wid:
+                return win
+        return None
+
+    def get_title(self, wid):
+        win = self.get_window(wid)
+        return win.title if win else None
+
+    def get_pid(self, wid):
+        win = self.get_window(wid)
+        return win.pid if win else None
+
+    def get_desktop(self, wid):
+        win = self.get_window(wid)
+        return win.desktop if win else None
+
+    def dofus_windows(self):
+        """Return {class: Window} for every 'Dofus-<Class>' client"""
+        windows = {}
+        for win in self.list_windows():
+            name = dofus_class(win.title)
+            if name and name not in windows:
+                windows[name] = win
+        return windows
+
+
+class CommandBackend(WindowBackend):
+    """Fallback backend driving wmctrl/xdotool as subprocesses."""
+
+    name = 'command'
+
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self.env = display_env(display_name)
+
+    def _run(self, cmd, timeout):
+        return run_cmd(cmd, timeout=timeout, env=self.env)
+
+    def list_windows(self):
+        out, _, code = self._run(['wmctrl', '-lp'], timeout=2)
+        if code != 0:
+            return []
+        windows = []
+        for line in out.splitlines():
+            # id, desktop, pid, host, then the title with its spaces intact
+            parts = line.split(None, 4)
+            if len(parts) < 4:
+                continue
+            try:
+                wid = int(parts[0], 16)
+                desktop = int(parts[1])
+                pid = int(parts[2]) or None
+            except ValueError:
+                continue
+            title = parts[4] if len(parts) == 5 else ''
+            windows.append(Window(wid, desktop, pid, title))
+        return windows
+
+    def get_workspaces(self):
+        return [(num, name) for num, name, _ in self._desktops()]
+
+    def current_desktop(self):
+        for num, _, current in self._desktops():
+            if current:
+                return int(num)
+        return None
+
+    def desktop_layout(self):
+        desktops = self._desktops()
+        current = next((int(num) for num, _, is_current in desktops if is_current), None)
+        return [name for _, name, _ in desktops], current
+
+    def _desktops(self):
+        out, _, code = self._run(['wmctrl', '-d'], timeout=2)
+        if code != 0:
+            return []
+        desktops = []
+        for line in out.splitlines():
+            parts = line.split(None, 9)
+            if len(parts) >= 10:
+                desktops.append((parts[0], parts[9], parts[1] == '*'))
+        return desktops
+
+    def active_window(self):
+        out, _, code = self._run(['xdotool', 'getactivewindow'], timeout=2)
+        try:
+            return int(out) if code == 0 else None
+        except ValueError:
+            return None
+
+    def rename(self, wid, title):
+        return self._run(['wmctrl', '-ir', _hex(wid), '-N', title], timeout=2)[2] == 0
+
+    def activate(self, wid):
+        return self._run(['wmctrl', '-ia', _hex(wid)], timeout=2)[2] == 0
+
+    def raise_focus(self, wid):
+        return self._run(['xdotool', 'windowraise', _hex(wid), 'windowfocus', _hex(wid)], timeout=2)[2] == 0
+
+    def switch_desktop(self, num):
+        return self._run(['wmctrl', '-s', str(num)], timeout=2)[2] == 0
+
+    def move_to_desktop(self, wid, num):
+        return self._run(['wmctrl', '-ir', _hex(wid), '-t', str(num)], timeout=2)[2] == 0
+
+    def unstick(self, wid):
+        return self._run(['wmctrl', '-ir', _hex(wid), '-b', 'remove,sticky'], timeout=2)[2] == 0
+
+
+class XlibBackend(WindowBackend):
+    """EWMH backend talking to the X server over one persistent connection."""
+
+    name = 'xlib'
+    serial = True
+
+    def __init__(self, display_name=None):
+        self.display = xdisplay.Display(display_name)
+        self.env = display_env(display_name)
+        self.root = self.display.screen().root
+        self._atoms = {}
+        self._supported = None
+
+    def atom(self, name):
+        if name not in self._atoms:
+            self._atoms[name] = self.display.intern_atom(name)
+        return self._atoms[name]
+
+    def _window(self, wid):
+        return self.display.create_resource_object('window', wid)
+
+    def _prop(self, window, name, prop_type=None):
+        if prop_type is None:
+            prop_type = X.AnyPropertyType
+        try:
+            prop = window.get_full_property(self.atom(name), prop_type)
+        except xerror.XError:
+            return None
+        return prop.value if prop else None
+
+    def _cardinal(self, window, name):
+        value = self._prop(window, name, Xatom.CARDINAL)
+        return int(value[0]) if value is not None and len(value) else None
+
+    def _text(self, window):
+        value = self._prop(window, '_NET_WM_NAME', self.atom('UTF8_STRING'))
+        if value is None:
+            value = self._prop(window, 'WM_NAME')
+        if value is None:
+            return ''
+        if isinstance(value, bytes):
+            return value.decode('utf-8', 'replace')
+        return str(value)
+
+    def client_list(self):
+        value = self._prop(self.root, '_NET_CLIENT_LIST', Xatom.WINDOW)
+        return [int(wid) for wid in value] if value is not None else []
+
+    def list_windows(self):
+        return [win for win in map(self.get_window, self.client_list()) if win]
+
+    def get_window(self, wid):
+        window = self._window(wid)
+        title = self._text(window)
+        desktop = self._cardinal(window, '_NET_WM_DESKTOP')
+        if desktop == ALL_DESKTOPS:
+            desktop = -1
+        return Window(wid, desktop if desktop is not None else -1,
+                      self._cardinal(window, '_NET_WM_PID'), title)
+
+    def get_title(self, wid):
+        return self._text(self._window(wid))
+
+    def get_pid(self, wid):
+        return self._cardinal(self._window(wid), '_NET_WM_PID')
+
+    def get_desktop(self, wid):
+        desktop = self._cardinal(self._window(wid), '_NET_WM_DESKTOP')
+        return -1 if desktop == ALL_DESKTOPS else desktop
+
+    def get_workspaces(self):
+        count = self._cardinal(self.root, '_NET_NUMBER_OF_DESKTOPS') or 0
+        raw = self._prop(self.root, '_NET_DESKTOP_NAMES', self.atom('UTF8_STRING')) or b''
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        names = raw.decode('utf-8', 'replace').split('\0')
+        return [(str(i), names[i] if i < len(names) and names[i] else f"Workspace {i + 1}")
+                for i in range(count)]
+
+    def current_desktop(self):
+        return self._cardinal(self.root, '_NET_CURRENT_DESKTOP')
+
+    def active_window(self):
+        value = self._prop(self.root, '_NET_ACTIVE_WINDOW', Xatom.WINDOW)
+        return int(value[0]) if value is not None and len(value) and value[0] else None
+
+    def _client_message(self, wid, type_name, data):
+        msg = xevent.ClientMessage(
+            window=self._window(wid), client_type=self.atom(type_name),
+            data=(32, (list(data) + [0] * 5)[:5]))
+        mask = X.SubstructureRedirectMask | X.SubstructureNotifyMask
+        self.root.send_event(msg, event_mask=mask)
+        self.display.flush()
+        return True
+
+    def rename(self, wid, title):
+        window = self._window(wid)
+        encoded = title.encode('utf-8')
+        try:
+            window.change_property(self.atom('_NET_WM_NAME'), self.atom('UTF8_STRING'), 8, encoded)
+            window.change_property(Xatom.WM_NAME, Xatom.STRING, 8, encoded)
+            self.display.flush()
+        except xerror.XError:
+            return False
+        return True
+
+    def activate(self, wid):
+        # Same sequence as `wmctrl -ia`: bring the desktop forward, then ask for focus
+        desktop = self.get_desktop(wid)
+        if desktop is not None and desktop >= 0 and desktop != self.current_desktop():
+            self.switch_desktop(desktop)
+        return self._client_message(wid, '_NET_ACTIVE_WINDOW', [SOURCE_PAGER, X.CurrentTime])
+
+    def raise_focus(self, wid):
+        desktop = self.get_desktop(wid)
+        if desktop is not None and desktop >= 0 and desktop != self.current_desktop():
+            self.switch_desktop(desktop)
+        window = self._window(wid)
+        window.configure(stack_mode=X.Above)
+        window.set_input_focus(X.RevertToParent, X.CurrentTime)
+        self.display.flush()
+        return True
+
+    def switch_desktop(self, num):
+        return self._client_message(self.root.id, '_NET_CURRENT_DESKTOP', [int(num), X.CurrentTime])
+
+    def move_to_desktop(self, wid, num):
+        return self._client_message(wid, '_NET_WM_DESKTOP', [int(num), SOURCE_PAGER])
+
+    def unstick(self, wid):
+        return self._client_message(
+            wid, '_NET_WM_STATE', [0, self.atom('_NET_WM_STATE_STICKY'), 0, SOURCE_PAGER])
+
+    def supports(self, hint):
+        if self._supported is None:
+            value = self._prop(self.root, '_NET_SUPPORTED', Xatom.ATOM)
+            self._supported = set(int(atom) for atom in value) if value is not None else set()
+        return self.atom(hint) in self._supported
+
+    def wm_name(self):
+        value = self._prop(self.root, '_NET_SUPPORTING_WM_CHECK', Xatom.WINDOW)
+        if value is None or not len(value):
+            return None
+        return self._text(self._window(int(value[0]))) or None
+
+    def stacking_order(self):
+        value = self._prop(self.root, '_NET_CLIENT_LIST_STACKING', Xatom.WINDOW)
+        return [int(wid) for wid in value] if value is not None else self.client_list()
+
+    def restack(self, wid, sibling, above=True):
+        if not self.supports('_NET_RESTACK_WINDOW'):
+            return False
+        detail = X.Above if above else X.Below
+        return self._client_message(wid, '_NET_RESTACK_WINDOW', [SOURCE_PAGER, sibling, detail])
+
+
+def display_env(display_name):
+    """os.environ with DISPLAY set to display_name (None: inherit the current one)"""
+    return dict(os.environ, DISPLAY=display_name) if display_name else None
+
+
+def _hex(wid):
+    return f"0x{wid:08x}"
+
+
+def create_backend(display_name=None):
+    """Return an XlibBackend when possible, else the wmctrl/xdotool fallback"""
+    if HAS_XLIB and os.environ.get('DOFUS_WM_BACKEND') != 'command':
+        try:
+            return XlibBackend(display_name)
+        except Exception:
+            pass
+    return CommandBackend(display_name)
+
+
+_backend = None
+
+
+def get_backend():
+    """Shared backend for the default display"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
@@ -0,0 +1,258 @@
+import argparse
+import sys
+
+from .config import CONFIG_FILE, DEFAULT_CLASS_INI, load_json
+
+
+def _class_list():
+    return load_json(CONFIG_FILE, {}).get('class_ini', DEFAULT_CLASS_INI.copy())
+
+
+def cmd_generate(args):
+    from .scripts import generate_all_scripts
+    changed = generate_all_scripts(_class_list(), args.workspace)
+    for path in changed:
+        print(f"Updated {path}")
+    print(f"{len(changed)} script(s) updated" if changed else "All scripts up to date")
+    return 0
+
+
+def cmd_rename(args):
+    from .actions import rename_windows
+    from .window_index import WindowIndex
+    from .workspace import class_list_for_desktop
+    from .executor import configured_jobs
+    config = load_json(CONFIG_FILE, {})
+    desktop = args.workspace
+    class_list = class_list_for_desktop(config, desktop)
+    if args.team:
+        team = _team(config, args.team)
+        if team is None:
+            return 1
+        desktop = desktop if desktop is not None else team.desktop
+        if desktop is None:
+            print(f"Team {team.name} has no desktop: pass --workspace", file=sys.stderr)
+            return 1
+        class_list = team.classes
+    log = rename_windows(class_list, WindowIndex(), mute=not args.no_mute, desktop=desktop,
+                         reset=args.reset, jobs=args.jobs or configured_jobs(config))
+    print('\n'.join(log))
+    return 0
+
+
+def _team(config, name):
+    from .teams import load_teams
+    team = load_teams(config).get(name)
+    if team is None:
+        print(f"Unknown team: {name}", file=sys.stderr)
+    return team
+
+
+def cmd_reorganize(args):
+    from .reorganize import reorganize_windows
+    from .window_index import WindowIndex
+    from .executor import configured_jobs
+    config = load_json(CONFIG_FILE, {})
+    report = reorganize_windows(config.get('class_ini', DEFAULT_CLASS_INI.copy()), WindowIndex(),
+                                method=args.method, minimal=not args.all,
+                                jobs=args.jobs or configured_jobs(config))
+    print(report.format())
+    return 1 if report.timeouts else 0
+
+
+def _display_backend(display):
+    """Backend for --display (None: the session's own display)"""
+    if not display:
+        return None
+    from .backend import create_backend
+    return create_backend(display)
+
+
+def cmd_cycle(args):
+    from .daemon import CycleDaemon, send_command
+    from .displays import display_paths
+    paths = display_paths(args.display)
+    command = f"{args.direction}:{args.team}" if args.team else args.direction
+    # A running daemon owns the cycle position: hand the press over
+    reply = send_command(command, paths.socket, timeout=0.5)
+    if reply is None:
+        reply = CycleDaemon(_display_backend(args.display), paths=paths).handle(command)
+    print(reply)
+    return 0 if reply.startswith('ok') else 1
+
+
+def cmd_profile(args):
+    from .profiles import ProfileStore
+    store = ProfileStore()
+    try:
+        if args.action == 'list':
+            for name in store.search(args.name or '', limit=args.limit):
+                print(name)
+            return 0
+        class_list = store.get(args.name) if args.name else None
+    finally:
+        store.close()
+    if not class_list:
+        print(f"Unknown profile: {args.name}", file=sys.stderr)
+        return 1
+    _set_class_list(class_list)
+    print(f"Loaded {args.name}: {' '.join(class_list)}")
+    return 0
+
+
+def _set_class_list(class_list):
+    """Save the initiative order the way the GUI does"""
+    from .config import CLASS_FILE, write_json
+    from .daemon import send_command
+    from .scripts import generate_class_file
+    config = load_json(CONFIG_FILE, {})
+    config['class_ini'] = list(class_list)
+    write_json(CONFIG_FILE, config)
+    if CLASS_FILE.exists():
+        generate_class_file(class_list)
+    send_command('reload', timeout=0.2)
+
+
+def cmd_team(args):
+    from .teams import TEAM_NAME, load_teams, team_entry
+    config = load_json(CONFIG_FILE, {})
+    if args.action == 'list':
+        for team in load_teams(config).values():
+            where = f"desktop {team.desktop}" if team.desktop is not None else "any desktop"
+            keys = ', '.join(f"{action}={binding}" for action, binding in team.hotkeys.items())
+            print(f"{team.name:<12} {where:<12} {' '.join(team.classes)}{'  ' + keys if keys else ''}")
+        return 0
+    if not args.name or not TEAM_NAME.match(args.name):
+        print("A team name (letters, digits, _) is required", file=sys.stderr)
+        return 1
+    teams = dict(config.get('teams') or {})
+    if args.action == 'delete':
+        if teams.pop(args.name, None) is None:
+            print(f"Unknown team: {args.name}", file=sys.stderr)
+            return 1
+    else:
+        old = teams.get(args.name) or {}
+        hotkeys = dict(old.get('hotkeys') or {})
+        if args.next:
+            hotkeys['cycle_next'] = args.next
+        if args.prev:
+            hotkeys['cycle_prev'] = args.prev
+        classes = args.classes or old.get('classes') or config.get('class_ini', DEFAULT_CLASS_INI.copy())
+        desktop = args.workspace if args.workspace is not None else old.get('desktop')
+        teams[args.name] = team_entry(classes, desktop, hotkeys)
+    config['teams'] = teams
+    _save_teams(config)
+    print(f"{'Deleted' if args.action == 'delete' else 'Saved'} team {args.name}")
+    return 0
+
+
+def _save_teams(config):
+    """Write the teams, refresh classes.sh and the team scripts, reload the daemon"""
+    from .config import CLASS_FILE, write_json
+    from .daemon import send_command
+    from .scripts import generate_class_file, generate_team_scripts
+    from .teams import load_teams
+    write_json(CONFIG_FILE, config)
+    if CLASS_FILE.exists():
+        class_list = config.get('class_ini', DEFAULT_CLASS_INI.copy())
+        teams = load_teams(config)
+        generate_class_file(class_list, teams=teams)
+        generate_team_scripts(class_list, teams)
+    send_command('reload', timeout=0.2)
+
+
+def cmd_activation(args):
+    from .activation import configured_method, probe, record_probe
+    config = load_json(CONFIG_FILE, {})
+    if args.action == 'probe':
+        from .config import CYCLE_FORWARD, write_json
+        from .daemon import send_command
+        from .window_index import WindowIndex
+        index = WindowIndex()
+        index.refresh()
+        best, results = probe([win.wid for win in index.dofus_windows().values()], index.backend)
+        if not results:
+            print("Need at least two Dofus windows to compare strategies", file=sys.stderr)
+            return 1
+        record_probe(config, best, results)
+        write_json(CONFIG_FILE, config)
+        if CYCLE_FORWARD.exists():
+            from .scripts import generate_cycle_backward, generate_cycle_forward, generate_team_scripts
+            generate_cycle_forward(_class_list())
+            generate_cycle_backward(_class_list())
+            generate_team_scripts(_class_list())
+        send_command('reload', timeout=0.2)
+    for name, result in (config.get('activation') or {}).get('timings', {}).items():
+        median = f"{result['median_ms']:.1f} ms" if result['median_ms'] is not None else "-"
+        print(f"{name:<12} {median:>10}  {result['confirmed']}/{result['tries']} confirmed")
+    print(f"Activation: {configured_method(config)}")
+    return 0
+
+
+def cmd_workspaces(args):
+    from .window_index import WindowIndex
+    index = WindowIndex(_display_backend(args.display), args.display)
+    index.refresh()
+    topology = index.topology()
+    for num, name in enumerate(topology.names):
+        current = "*" if num == topology.current else " "
+        print(f"{num} {current} {name}\t{topology.dofus.get(num, 0)} Dofus")
+    return 0
+
+
+def build_parser():
+    """python -m core <command>; commands import their modules lazily and never touch PyQt6"""
+    parser = argparse.ArgumentParser(prog='python -m core', description="Dofus Window Manager (headless)")
+    parser.add_argument('--display', help="X display for cycle and workspaces, e.g. :1 (default: $DISPLAY)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('generate', help="regenerate the scripts from config.json")
+    p.add_argument('--workspace', type=int, help="workspace used by rename_windows.sh")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser('rename', help="rename the Dofus windows and mute followers")
+    p.add_argument('--no-mute', action='store_true', help="do not touch audio")
+    p.add_argument('--workspace', type=int, help="only the windows on this desktop")
+    p.add_argument('--team', help="only this team's windows, named after its order")
+    p.add_argument('--reset', action='store_true', help="rename every window in client-list order")
+    p.add_argument('--jobs', type=int, help="concurrent renames/pactl calls (config: parallel_jobs)")
+    p.set_defaults(func=cmd_rename)
+
+    p = sub.add_parser('reorganize', help="reorder the Dofus windows in the taskbar")
+    p.add_argument('--method', choices=['auto', 'bounce', 'restack'], default='auto')
+    p.add_argument('--all', action='store_true', help="move every window, not only misplaced ones")
+    p.add_argument('--jobs', type=int, help="windows sent away at once (config: parallel_jobs)")
+    p.set_defaults(func=cmd_reorganize)
+
+    p = sub.add_parser('cycle', help="focus the next or previous account")
+    p.add_argument('direction', choices=['next', 'prev'])
+    p.add_argument('--team', help="cycle this team instead of the main order")
+    p.set_defaults(func=cmd_cycle)
+
+    p = sub.add_parser('profile', help="list or load saved profiles")
+    p.add_argument('action', choices=['load', 'list'])
+    p.add_argument('name', nargs='?', help="profile to load, or filter for list")
+    p.add_argument('--limit', type=int, default=50)
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser('team', help="list, save or delete named teams")
+    p.add_argument('action', choices=['list', 'save', 'delete'])
+    p.add_argument('name', nargs='?')
+    p.add_argument('--classes', nargs='+', help="initiative order (default: the current one)")
+    p.add_argument('--workspace', type=int, help="desktop the team plays on")
+    p.add_argument('--next', help="hotkey cycling forward, e.g. Super+Ctrl+Right")
+    p.add_argument('--prev', help="hotkey cycling backward")
+    p.set_defaults(func=cmd_team)
+
+    p = sub.add_parser('activation', help="show or measure window activation strategies")
+    p.add_argument('action', nargs='?', choices=['show', 'probe'], default='show')
+    p.set_defaults(func=cmd_activation)
+
+    p = sub.add_parser('workspaces', help="list workspaces")
+    p.set_defaults(func=cmd_workspaces)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
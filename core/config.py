@@ -1,13 +1,18 @@
 from pathlib import Path
 import json
+import os
+
+from .utils import atomic_write
 
 APP_NAME = "Dofus Window Manager"
 
-CONFIG_DIR = Path.home() / ".config" / "dofus_window_manager"
+# DOFUS_WM_CONFIG_DIR / DOFUS_WM_STATE_FILE let the benchmarks run in a sandbox
+CONFIG_DIR = Path(os.environ.get("DOFUS_WM_CONFIG_DIR") or Path.home() / ".config" / "dofus_window_manager")
 CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
 CONFIG_FILE = CONFIG_DIR / "config.json"
 PROFILES_FILE = CONFIG_DIR / "profiles.json"
+PROFILES_DB = CONFIG_DIR / "profiles.db"
 
 SCRIPT_DIR = CONFIG_DIR / "scripts"
 SCRIPT_DIR.mkdir(exist_ok=True)
@@ -19,6 +24,19 @@ CYCLE_FORWARD = SCRIPT_DIR / "cycle_forward.sh"
 CYCLE_BACKWARD = SCRIPT_DIR / "cycle_backward.sh"
 TOGGLE_WORKSPACE = SCRIPT_DIR / "toggle_workspace.sh"
 SPACE_CYCLE_FORWARD = SCRIPT_DIR / "space_cycle_forward.sh"
+CYCLE_CLIENT = SCRIPT_DIR / "cycle_client.py"
+CLASS_FILE = SCRIPT_DIR / "classes.sh"
+SCRIPT_MANIFEST = SCRIPT_DIR / ".manifest.json"
+
+CYCLE_STATE_FILE = Path(os.environ.get("DOFUS_WM_STATE_FILE") or "/tmp/dofus_window_index")
+RUNTIME_DIR = Path(os.environ.get("XDG_RUNTIME_DIR") or "/tmp")
+DAEMON_SOCKET = RUNTIME_DIR / "dofus_window_manager.sock"
+DAEMON_PIDFILE = RUNTIME_DIR / "dofus_window_manager.pid"
+CYCLE_FIFO = RUNTIME_DIR / "dofus_window_manager.fifo"
+# Client identity (PID:start time) -> class name, kept until the session ends
+IDENTITY_FILE = RUNTIME_DIR / "dofus_window_manager.identities"
+# Desktop -> window ids in taskbar (arrival) order, for indexes started cold
+TASKBAR_FILE = RUNTIME_DIR / "dofus_window_manager.taskbar"
 
 DEFAULT_CLASS_INI = ['Feca', 'Cra', 'Enu', 'Panda', 'Sadi']
 
@@ -31,10 +49,6 @@ def load_json(path, default=None):
         return default if default is not None else {}
 
 
-def save_json(path, data):
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
\ No newline at end of file
+def write_json(path, data):
+    """Atomically replace path with data; raises OSError on failure"""
+    atomic_write(path, json.dumps(data, ensure_ascii=False, indent=2), fsync=True)
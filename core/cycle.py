@@ -0,0 +1,47 @@
+from .config import CYCLE_STATE_FILE
+
+
+class CycleRing:
+    """Initiative order plus the position of the last focused account."""
+
+    def __init__(self, class_list, state_file=CYCLE_STATE_FILE):
+        self.class_list = list(class_list)
+        self.state_file = state_file
+        self.index = self._read_state()
+
+    def _read_state(self):
+        try:
+            return int(self.state_file.read_text().strip())
+        except Exception:
+            return 0
+
+    def _write_state(self):
+        try:
+            self.state_file.write_text(f"{self.index}\n")
+        except Exception:
+            pass
+
+    def peek(self, available, step=1):
+        """
+        Return (index, class) of the account step available accounts away
+        (negative goes backwards), or None. A burst of N presses is one peek(N).
+        """
+        total = len(self.class_list)
+        count = sum(1 for name in self.class_list if name in available)
+        if not total or not count or not step:
+            return None
+        direction = 1 if step > 0 else -1
+        remaining = (abs(step) - 1) % count + 1
+        for i in range(1, total + 1):
+            nxt = (self.index + direction * i) % total
+            name = self.class_list[nxt]
+            if name in available:
+                remaining -= 1
+                if not remaining:
+                    return nxt, name
+        return None
+
+    def commit(self, index):
+        """Remember index as the focused account (shared with the bash scripts)"""
+        self.index = index
+        self._write_state()
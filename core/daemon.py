@@ -0,0 +1,320 @@
+import os
+import select
+import socket
+import socketserver
+import threading
+
+from .config import CYCLE_FIFO, DAEMON_SOCKET, DEFAULT_CLASS_INI
+from .actions import follower_filter
+from .activation import Activator, configured_method, probe, record_probe
+from .audio import AudioMuter
+from .backend import create_backend, get_backend
+from .cycle import CycleRing
+from .displays import display_paths, load_display_config, update_display_config
+from .teams import load_teams, team_state_file
+from .window_index import WindowIndex
+from .workspace import DEFAULT_WORKSPACE_RING, class_list_for_desktop, toggle_workspace
+
+
+class CycleDaemon:
+    """
+    Long-lived cycle service: window index and cycle index stay in memory.
+    paths (displays.display_paths()) selects the config and state of one display.
+    """
+
+    def __init__(self, backend=None, index=None, paths=None):
+        self.backend = backend or get_backend()
+        self.paths = paths or display_paths()
+        self.index = index or WindowIndex(self.backend, self.paths.display)
+        self.activate = Activator(self.backend)
+        self.ring = None
+        # Named teams: {name: Team} and their own rings (own state file)
+        self.teams = {}
+        self.team_rings = {}
+        self.workspace_ring = DEFAULT_WORKSPACE_RING
+        self.class_ini_by_desktop = {}
+        # Socket, FIFO and hotkey presses all go through cycle(): one at a time
+        self._cycle_lock = threading.Lock()
+        self.reload()
+
+    def reload(self, class_ini=None):
+        """Re-read the initiative order and the teams from config.json (or use class_ini)"""
+        if class_ini is None:
+            cfg = load_display_config(self.paths)
+            class_ini = cfg.get('class_ini', DEFAULT_CLASS_INI.copy())
+            self.activate.method = configured_method(cfg)
+            self.workspace_ring = cfg.get('workspace_ring') or DEFAULT_WORKSPACE_RING
+            self.class_ini_by_desktop = cfg.get('class_ini_by_desktop') or {}
+            self.set_teams(load_teams(cfg))
+        index = self.ring.index if self.ring else None
+        self.ring = CycleRing(class_ini, self.paths.state_file)
+        if index is not None:
+            self.ring.index = index
+        return f"{len(class_ini)} classes"
+
+    def set_teams(self, teams):
+        """Replace the teams; a team that keeps its name keeps its position"""
+        rings = {}
+        for name, team in teams.items():
+            old = self.team_rings.get(name)
+            rings[name] = CycleRing(team.classes, team_state_file(name, self.paths.state_file))
+            if old is not None:
+                rings[name].index = old.index
+        self.teams = dict(teams)
+        self.team_rings = rings
+
+    def class_list_for(self, desktop):
+        """Initiative order of one desktop (falls back to the cycled order)"""
+        return class_list_for_desktop({'class_ini': self.ring.class_list,
+                                       'class_ini_by_desktop': self.class_ini_by_desktop}, desktop)
+
+    def scan(self):
+        """Rebuild the window index from a single client listing"""
+        self.index.refresh()
+        return f"{len(self.index.dofus_windows())} windows"
+
+    def cycle(self, step, team=None):
+        """
+        Focus the account step positions away (N queued presses = one step of N)
+        in the default ring or in one team's; without X events, rescan once if stale.
+        """
+        with self._cycle_lock:
+            return self._cycle(step, team)
+
+    def _cycle(self, step, team=None):
+        if team is None:
+            ring, desktop = self.ring, None
+        elif team in self.team_rings:
+            ring, desktop = self.team_rings[team], self.teams[team].desktop
+        else:
+            return None
+        for _ in range(2):
+            # Only this ring's classes are looked up, never the other teams' windows
+            available = self.index.class_windows(ring.class_list, desktop)
+            target = ring.peek(available, step)
+            if target is not None:
+                index, name = target
+                if self.activate(available[name].wid):
+                    ring.commit(index)
+                    return name
+            if self.index.live:
+                break
+            self.index.refresh()
+        return None
+
+    def toggle_workspace(self, step=1):
+        """Next desktop of the workspace ring, read from the cached topology"""
+        with self._cycle_lock:
+            return toggle_workspace(self.backend, self.index, self.workspace_ring, step)
+
+    def on_hotkey(self, action, count=1):
+        """HotkeyGrabber callback for a display served without the GUI"""
+        action, _, team = action.partition(':')
+        if action in ('cycle_next', 'cycle_prev'):
+            self.cycle(count if action == 'cycle_next' else -count, team or None)
+        elif action == 'toggle_workspace':
+            self.toggle_workspace(count)
+        elif action in ('rename', 'reorganize'):
+            # Slow: off the grabber thread
+            threading.Thread(target=self._run_action, args=(action,), daemon=True).start()
+
+    def _run_action(self, action):
+        if action == 'rename':
+            from .actions import rename_windows
+            rename_windows(self.ring.class_list, self.index, self.backend)
+        else:
+            from .reorganize import reorganize_windows
+            reorganize_windows(self.ring.class_list, self.index, self.backend)
+
+    def handle(self, command):
+        """Execute one protocol command and return the reply line"""
+        command, _, count = command.partition(' ')
+        # 'next:<team>' cycles one team
+        command, _, team = command.partition(':')
+        if command in ('next', 'prev'):
+            try:
+                step = int(count) if count else 1
+            except ValueError:
+                return f"error bad count: {count}"
+            if team and team not in self.team_rings:
+                return f"error unknown team: {team}"
+            name = self.cycle(step if command == 'next' else -step, team or None)
+        elif command == 'workspace':
+            return f"ok workspace {self.toggle_workspace()}"
+        elif command == 'refresh':
+            return f"ok {self.scan()}"
+        elif command == 'reload':
+            self.reload()
+            return f"ok {self.scan()}"
+        elif command == 'ping':
+            return f"ok pong {self.backend.name}"
+        else:
+            return f"error unknown command: {command}"
+        if name is None:
+            return "error no window"
+        return f"ok Dofus-{name}"
+
+
+def parse_presses(data):
+    """
+    Net cycle steps and workspace step of a batch of queued lines:
+    ({team or None: step}, workspace); 'next:<team>' counts for that team.
+    """
+    steps = {}
+    workspace = 0
+    for word in data.decode('ascii', 'replace').split():
+        if word == 'workspace':
+            workspace += 1
+            continue
+        command, _, team = word.partition(':')
+        if command in ('next', 'prev'):
+            team = team or None
+            steps[team] = steps.get(team, 0) + (1 if command == 'next' else -1)
+    return steps, workspace
+
+
+def serve_fifo(daemon, path=CYCLE_FIFO):
+    """
+    Read presses written by the cycle scripts (`echo next 1<> fifo`, no fork)
+    and apply everything queued since the last activation as a single step.
+    """
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    os.mkfifo(path, 0o600)
+    # Opened read-write so the FIFO never reports EOF between writers
+    fd = os.open(path, os.O_RDWR)
+
+    def loop():
+        while True:
+            data = os.read(fd, 4096)
+            # Presses that arrived meanwhile supersede each other: drain them all
+            while select.select([fd], [], [], 0)[0]:
+                data += os.read(fd, 4096)
+            steps, workspace = parse_presses(data)
+            try:
+                if workspace:
+                    daemon.toggle_workspace(workspace)
+                for team, step in steps.items():
+                    if step:
+                        daemon.cycle(step, team)
+            except Exception:
+                pass
+
+    threading.Thread(target=loop, name='cycle-fifo', daemon=True).start()
+    return fd
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline().decode('utf-8', 'replace').strip()
+        if line == 'quit':
+            self.wfile.write(b"ok bye\n")
+            # Stops every display served by this process
+            self.server.stopped.set()
+            return
+        reply = self.server.daemon.handle(line)
+        self.wfile.write((reply + "\n").encode('utf-8'))
+
+
+class _Server(socketserver.UnixStreamServer):
+    # Requests are handled one at a time, so presses never race on the index
+    def __init__(self, path, daemon, stopped):
+        self.daemon = daemon
+        self.stopped = stopped
+        super().__init__(str(path), _Handler)
+
+
+def send_command(command, socket_path=DAEMON_SOCKET, timeout=1.0):
+    """Send a command to a running daemon, return its reply or None"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall((command + "\n").encode('utf-8'))
+            return sock.makefile('r', encoding='utf-8').readline().strip()
+    except OSError:
+        return None
+
+
+class _DisplayService:
+    """One served display: X connection, window index, cycle daemon, socket, FIFO, hotkeys."""
+
+    def __init__(self, paths, stopped, grab_hotkeys=False):
+        self.paths = paths
+        backend = create_backend(paths.display) if paths.display else get_backend()
+        self.daemon = CycleDaemon(backend, paths=paths)
+        self.daemon.index.start()
+        self.config = load_display_config(paths)
+        if (self.config.get('activation') or {}).get('method') == 'auto':
+            # Pick the fastest confirmed activation strategy for this WM
+            wids = [win.wid for win in self.daemon.index.dofus_windows().values()]
+            best, results = probe(wids, backend, self.daemon.index)
+            if results:
+                settings = record_probe(self.config, best, results)
+                update_display_config(paths, activation=settings)
+                self.daemon.activate.method = configured_method(self.config)
+                print(f"Activation ({paths.display or 'default'}): {self.daemon.activate.method}")
+        try:
+            paths.socket.unlink()
+        except FileNotFoundError:
+            pass
+        self.server = _Server(paths.socket, self.daemon, stopped)
+        os.chmod(paths.socket, 0o600)
+        self.fifo = serve_fifo(self.daemon, paths.fifo)
+        self.hotkeys = None
+        if grab_hotkeys:
+            from .hotkeys import DEFAULT_HOTKEYS, HotkeyGrabber
+            from .teams import team_hotkeys
+            bindings = dict(self.config.get('hotkeys') or DEFAULT_HOTKEYS)
+            bindings.update(team_hotkeys(load_teams(self.config)))
+            self.hotkeys = HotkeyGrabber(bindings, self.daemon.on_hotkey, paths.display).start()
+        threading.Thread(target=self.server.serve_forever, name='cycle-socket', daemon=True).start()
+        # The scripts check this pid with [[ -e /proc/$PID ]] before writing to the FIFO
+        paths.pidfile.write_text(f"{os.getpid()}\n")
+        print(f"Listening on {paths.socket}")
+
+    def close(self):
+        if self.hotkeys:
+            self.hotkeys.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        os.close(self.fifo)
+        for path in (self.paths.socket, self.paths.fifo, self.paths.pidfile):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def run_daemon(displays=None):
+    """
+    Serve cycle requests until 'quit' is received. With displays (X display
+    names) one process serves them all, each with its own connection, window
+    index, config, state, socket and FIFO, and grabs each display's hotkeys.
+    """
+    targets = [display_paths(name) for name in displays] if displays else [display_paths()]
+    stopped = threading.Event()
+    services = []
+    try:
+        for paths in targets:
+            if send_command('ping', paths.socket) is not None:
+                print(f"Daemon already running on {paths.socket}")
+                continue
+            services.append(_DisplayService(paths, stopped, grab_hotkeys=bool(displays)))
+        if not services:
+            return 1
+        filters = [follower_filter(service.daemon.index, service.daemon.class_list_for)
+                   for service in services if service.config.get('auto_mute')]
+        if filters:
+            # Mute followers' new audio streams as soon as they appear, on any display
+            AudioMuter().watch(lambda pid: any(should_mute(pid) for should_mute in filters))
+        try:
+            stopped.wait()
+        except KeyboardInterrupt:
+            pass
+    finally:
+        for service in services:
+            service.close()
+    return 0
@@ -0,0 +1,61 @@
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from .config import (CONFIG_DIR, CONFIG_FILE, CYCLE_FIFO, CYCLE_STATE_FILE, DAEMON_PIDFILE,
+                     DAEMON_SOCKET, IDENTITY_FILE, RUNTIME_DIR, TASKBAR_FILE, load_json, write_json)
+
+# Where one display keeps its config and runtime state
+DisplayPaths = namedtuple('DisplayPaths',
+                          'display config_file state_file socket fifo pidfile identity_file taskbar_file')
+
+
+def display_slug(display_name):
+    """':1' -> '1', 'host:10.0' -> 'host_10.0' (safe in file names)"""
+    return re.sub(r'[^A-Za-z0-9.]+', '_', display_name).strip('_') or 'default'
+
+
+def display_paths(display_name=None):
+    """
+    Paths of one display. The session's own display ($DISPLAY, or None) keeps
+    the usual files, so its scripts and GUI are unaffected; any other display
+    gets displays/<slug>/config.json and runtime files suffixed with its slug.
+    """
+    if not display_name or display_name == os.environ.get('DISPLAY'):
+        return DisplayPaths(display_name, CONFIG_FILE, CYCLE_STATE_FILE, DAEMON_SOCKET, CYCLE_FIFO,
+                            DAEMON_PIDFILE, IDENTITY_FILE, TASKBAR_FILE)
+    return slug_paths(display_name, display_slug(display_name))
+
+
+def slug_paths(display_name, slug):
+    """
+    Paths of a display other than the session's, named after its slug.
+    The generated scripts pass a shell expansion as slug and get the same
+    paths at runtime.
+    """
+    return DisplayPaths(
+        display_name,
+        CONFIG_DIR / "displays" / slug / "config.json",
+        Path(f"{CYCLE_STATE_FILE}.display{slug}"),
+        RUNTIME_DIR / f"dofus_window_manager.{slug}.sock",
+        RUNTIME_DIR / f"dofus_window_manager.{slug}.fifo",
+        RUNTIME_DIR / f"dofus_window_manager.{slug}.pid",
+        RUNTIME_DIR / f"dofus_window_manager.{slug}.identities",
+        RUNTIME_DIR / f"dofus_window_manager.{slug}.taskbar",
+    )
+
+
+def load_display_config(paths):
+    """The main config.json with the display's own config.json laid over it"""
+    config = load_json(CONFIG_FILE, {})
+    if paths.config_file != CONFIG_FILE:
+        config.update(load_json(paths.config_file, {}))
+    return config
+
+
+def update_display_config(paths, **values):
+    """Store values in the display's own config.json (the main one for the session display)"""
+    config = load_json(paths.config_file, {})
+    config.update(values)
+    write_json(paths.config_file, config)
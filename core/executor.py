@@ -0,0 +1,70 @@
+import time
+
+# Concurrent window operations (config: parallel_jobs)
+DEFAULT_JOBS = 4
+
+
+def configured_jobs(config):
+    """parallel_jobs from config.json, at least 1"""
+    try:
+        return max(1, int(config.get('parallel_jobs', DEFAULT_JOBS)))
+    except (TypeError, ValueError):
+        return DEFAULT_JOBS
+
+
+def workers_for(backend, jobs):
+    """One worker for backends whose requests are pipelined on a single connection"""
+    return 1 if getattr(backend, 'serial', False) else max(1, jobs)
+
+
+class ParallelStats:
+    """Wall time of parallel batches against the time the same jobs take one by one."""
+
+    def __init__(self):
+        self.jobs = 0
+        self.workers = 0
+        self.serial = 0.0
+        self.wall = 0.0
+
+    @property
+    def saved(self):
+        return max(self.serial - self.wall, 0.0)
+
+    def format(self):
+        return (f"{self.jobs} jobs on {self.workers} workers: {self.wall * 1000:.0f} ms "
+                f"({self.saved * 1000:.0f} ms saved)")
+
+
+def run_parallel(jobs, max_workers=DEFAULT_JOBS, stats=None):
+    """
+    Run callables with at most max_workers at once. Results come back in job
+    order; a job that raised returns its exception instead. Timings are added
+    to stats (a ParallelStats) when given.
+    """
+    jobs = list(jobs)
+    durations = [0.0] * len(jobs)
+
+    def timed(i):
+        begin = time.monotonic()
+        try:
+            return jobs[i]()
+        except Exception as e:
+            return e
+        finally:
+            durations[i] = time.monotonic() - begin
+
+    workers = max(1, min(max_workers, len(jobs)))
+    started = time.monotonic()
+    if workers == 1:
+        results = [timed(i) for i in range(len(jobs))]
+    else:
+        # Imported here: the cycle path loads this module and never needs threads
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(timed, range(len(jobs))))
+    if stats is not None and jobs:
+        stats.jobs += len(jobs)
+        stats.workers = max(stats.workers, workers)
+        stats.serial += sum(durations)
+        stats.wall += time.monotonic() - started
+    return results
@@ -0,0 +1,155 @@
+import os
+import select
+import threading
+
+from .backend import HAS_XLIB, XlibBackend
+from .utils import close_pipe
+
+if HAS_XLIB:
+    from Xlib import X, XK, error as xerror
+
+# Action name -> key combination; the same names are used in config.json
+DEFAULT_HOTKEYS = {
+    'cycle_next': 'Super+Right',
+    'cycle_prev': 'Super+Left',
+    'rename': 'Super+Up',
+    'reorganize': 'Super+Down',
+    'toggle_workspace': 'Super+Shift+space',
+}
+
+MODIFIERS = {
+    'shift': 'ShiftMask',
+    'ctrl': 'ControlMask',
+    'control': 'ControlMask',
+    'alt': 'Mod1Mask',
+    'mod1': 'Mod1Mask',
+    'super': 'Mod4Mask',
+    'win': 'Mod4Mask',
+    'mod4': 'Mod4Mask',
+}
+
+
+def parse_binding(binding):
+    """'Super+Shift+space' -> (keysym, modifier mask); raises ValueError"""
+    *mods, key = [part.strip() for part in binding.split('+')]
+    mask = 0
+    for mod in mods:
+        if mod.lower() not in MODIFIERS:
+            raise ValueError(f"unknown modifier: {mod}")
+        mask |= getattr(X, MODIFIERS[mod.lower()])
+    keysym = XK.string_to_keysym(key)
+    if not keysym and len(key) == 1:
+        keysym = XK.string_to_keysym(key.lower())
+    if not keysym:
+        raise ValueError(f"unknown key: {key}")
+    return keysym, mask
+
+
+class HotkeyGrabber:
+    """
+    Global hotkeys grabbed with XGrabKey on a dedicated connection.
+    callback(action, count) runs on the grabber thread as soon as the key is
+    pressed, so it must be quick or hand the work over; count > 1 when key
+    repeats of the same action queued up meanwhile. Bindings another client already
+    grabbed (e.g. a desktop shortcut running the generated script) end up in
+    .failed and keep working through that client.
+    """
+
+    def __init__(self, bindings, callback, display_name=None):
+        self.bindings = dict(bindings)
+        self.callback = callback
+        self.display_name = display_name
+        self.grabbed = {}
+        self.failed = {}
+        self._thread = None
+        self._wake = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Grab every binding and start dispatching; returns once grabs are known"""
+        if not HAS_XLIB or self._thread is not None:
+            return self
+        self._wake = os.pipe()
+        self._thread = threading.Thread(target=self._event_loop, name='hotkeys', daemon=True)
+        self._thread.start()
+        self._ready.wait(2.0)
+        return self
+
+    def stop(self):
+        if self._wake is not None:
+            os.write(self._wake[1], b'x')
+        if self._thread is not None:
+            self._thread.join(1.0)
+            if self._thread.is_alive():
+                # Still inside select() on the pipe: leave it open rather than race it
+                return
+        self._thread = None
+        close_pipe(self._wake)
+        self._wake = None
+
+    def _grab(self, conn, root):
+        disp = conn.display
+        # NumLock (Mod2) and CapsLock must not prevent a match
+        lock_masks = (0, X.LockMask, X.Mod2Mask, X.LockMask | X.Mod2Mask)
+        keys = {}
+        for action, binding in self.bindings.items():
+            if not binding:
+                continue
+            try:
+                keysym, mask = parse_binding(binding)
+            except ValueError as e:
+                self.failed[action] = str(e)
+                continue
+            keycode = disp.keysym_to_keycode(keysym)
+            if not keycode:
+                self.failed[action] = f"no key for {binding}"
+                continue
+            catcher = xerror.CatchError(xerror.BadAccess)
+            for lock in lock_masks:
+                root.grab_key(keycode, mask | lock, False, X.GrabModeAsync, X.GrabModeAsync,
+                              onerror=catcher)
+            disp.sync()
+            if catcher.get_error():
+                self.failed[action] = f"{binding} already grabbed by another client"
+                for lock in lock_masks:
+                    root.ungrab_key(keycode, mask | lock)
+                continue
+            keys[(keycode, mask)] = action
+            self.grabbed[action] = binding
+        disp.sync()
+        return keys
+
+    def _event_loop(self):
+        conn = XlibBackend(self.display_name)
+        disp = conn.display
+        root = conn.root
+        try:
+            keys = self._grab(conn, root)
+        finally:
+            self._ready.set()
+        relevant = X.ShiftMask | X.ControlMask | X.Mod1Mask | X.Mod4Mask
+
+        while True:
+            # Consecutive presses of one action are delivered as a single call
+            batch = []
+            while disp.pending_events():
+                ev = disp.next_event()
+                if ev.type != X.KeyPress:
+                    continue
+                action = keys.get((ev.detail, ev.state & relevant))
+                if not action:
+                    continue
+                if batch and batch[-1][0] == action:
+                    batch[-1][1] += 1
+                else:
+                    batch.append([action, 1])
+            for action, count in batch:
+                try:
+                    self.callback(action, count)
+                except Exception:
+                    pass
+            readable, _, _ = select.select([disp.fileno(), self._wake[0]], [], [])
+            if self._wake[0] in readable:
+                root.ungrab_key(X.AnyKey, X.AnyModifier)
+                disp.close()
+                return
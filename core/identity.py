@@ -0,0 +1,65 @@
+from .config import IDENTITY_FILE
+from .utils import atomic_write, dofus_class
+
+
+def process_identity(pid):
+    """'PID:start time' from /proc, stable for the life of the process; None if unreadable"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except (OSError, TypeError):
+        return None
+    # The command name may contain spaces: fields are counted after its ')'
+    fields = stat.rsplit(')', 1)[-1].split()
+    return f"{pid}:{fields[19]}" if len(fields) > 19 else None
+
+
+def window_identity(win):
+    """Identity of the client owning win (its window id when /proc has no answer)"""
+    return (win.pid and process_identity(win.pid)) or f"wid:{win.wid:#010x}"
+
+
+def load_identities(path=IDENTITY_FILE):
+    """{identity: class name} from the 'identity name' lines of path"""
+    known = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    known[parts[0]] = parts[1]
+    except OSError:
+        pass
+    return known
+
+
+def save_identities(known, path=IDENTITY_FILE):
+    atomic_write(path, ''.join(f"{identity} {name}\n" for identity, name in sorted(known.items())),
+                 mode=0o644)
+
+
+def assign_names(windows, class_list, known, reset=False):
+    """
+    Class name of each window (None when class_list runs out), by priority:
+    the name remembered for its client identity, then the class its title
+    already carries, then the names left over, in initiative order and
+    client-list order. reset=True ignores both and assigns by position.
+    Returns (names, identities), two lists parallel to windows.
+    """
+    identities = [window_identity(win) for win in windows]
+    names = [None] * len(windows)
+    taken = set()
+    if not reset:
+        wanted = set(class_list)
+        # Remembered identities first, so a drifted title cannot steal a name
+        for guesses in ([known.get(identity) for identity in identities],
+                        [dofus_class(win.title) for win in windows]):
+            for i, name in enumerate(guesses):
+                if names[i] is None and name in wanted and name not in taken:
+                    names[i] = name
+                    taken.add(name)
+    free = iter([name for name in class_list if name not in taken])
+    for i in range(len(windows)):
+        if names[i] is None:
+            names[i] = next(free, None)
+    return names, identities
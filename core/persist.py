@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+from .config import write_json
+
+
+class WriteBehind:
+    """
+    Debounced JSON persistence on a background thread.
+    save() only records the latest content of a file; it is written once no
+    new save arrived for `delay` seconds (or after `max_delay` under a steady
+    stream of changes). on_error(path, message) and `after` (the one given
+    with the latest save of a path) run on the writer thread.
+    """
+
+    def __init__(self, delay=0.3, max_delay=2.0, on_error=None):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_error = on_error
+        self._pending = {}
+        self._first = None
+        self._last = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='dofus-write-behind', daemon=True)
+        self._thread.start()
+
+    def save(self, path, data, after=None):
+        """Queue data for path; a later save of the same path replaces it"""
+        # Snapshot now so the caller may keep mutating its dict
+        snapshot = json.loads(json.dumps(data))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehind is closed")
+            self._pending[path] = (snapshot, after)
+            now = time.monotonic()
+            self._first = self._first or now
+            self._last = now
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return list(self._pending)
+
+    def flush(self):
+        """Write everything queued now and stop the writer (call on quit)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                while self._pending and not self._closed:
+                    deadline = min(self._last + self.delay, self._first + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._first = self._last = None
+                closed = self._closed
+            for path, (data, after) in batch.items():
+                self._write(path, data, after)
+            if closed and not batch:
+                return
+
+    def _write(self, path, data, after):
+        try:
+            write_json(path, data)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(path, str(e) or e.__class__.__name__)
+            return
+        if after:
+            try:
+                after()
+            except Exception:
+                pass
@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+
+from .config import PROFILES_DB, PROFILES_FILE, load_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name    TEXT PRIMARY KEY,
+    key     TEXT NOT NULL,
+    classes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_key ON profiles (key);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT = ("INSERT INTO profiles (name, key, classes) VALUES (?, ?, ?) "
+          "ON CONFLICT (name) DO UPDATE SET classes = excluded.classes")
+
+
+def fuzzy_score(query, name):
+    """
+    Score name against query (both lowercase) when query's letters appear in
+    order in name, else None. Lower is better: consecutive letters and an early
+    first match win.
+    """
+    pos = name.find(query[0]) if query else 0
+    if pos < 0:
+        return None
+    score = pos
+    for char in query[1:]:
+        nxt = name.find(char, pos + 1)
+        if nxt < 0:
+            return None
+        score += nxt - pos - 1
+        pos = nxt
+    return score
+
+
+class ProfileStore:
+    """
+    Team layouts (name -> class list) in SQLite.
+    Only names are listed; a profile's classes are read when it is loaded, and
+    saving or deleting touches a single row. profiles.json is imported on open
+    whenever it changed since the last import.
+    """
+
+    def __init__(self, path=PROFILES_DB, legacy_file=PROFILES_FILE):
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript(SCHEMA)
+        if legacy_file:
+            self.import_json(legacy_file)
+
+    def close(self):
+        self.db.close()
+
+    def __contains__(self, name):
+        return self.db.execute("SELECT 1 FROM profiles WHERE name = ?", (name,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def names(self, limit=None):
+        sql = "SELECT name FROM profiles ORDER BY key, name"
+        if limit:
+            return [row[0] for row in self.db.execute(sql + " LIMIT ?", (limit,))]
+        return [row[0] for row in self.db.execute(sql)]
+
+    def get(self, name, default=None):
+        row = self.db.execute("SELECT classes FROM profiles WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, name, class_list):
+        with self.db:
+            self.db.execute(UPSERT, (name, name.lower(), json.dumps(list(class_list), ensure_ascii=False)))
+
+    def delete(self, name):
+        with self.db:
+            return self.db.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def search(self, query, limit=50):
+        """Prefix matches first (from the index), then fuzzy subsequence matches"""
+        query = query.strip().lower()
+        if not query:
+            return self.names(limit)
+        # Every key starting with query sorts between query and query + U+FFFF
+        found = [row[0] for row in self.db.execute(
+            "SELECT name FROM profiles WHERE key >= ? AND key < ? ORDER BY key, name LIMIT ?",
+            (query, query + '\uffff', limit))]
+        if len(found) >= limit:
+            return found
+        seen = set(found)
+        fuzzy = []
+        for name, key in self.db.execute("SELECT name, key FROM profiles"):
+            if name in seen:
+                continue
+            score = fuzzy_score(query, key)
+            if score is not None:
+                fuzzy.append((score, key, name))
+        fuzzy.sort()
+        return found + [name for _, _, name in fuzzy[:limit - len(found)]]
+
+    def import_json(self, path):
+        """Upsert every profile of a profiles.json; skipped if unchanged since last import"""
+        try:
+            stamp = str(os.stat(path).st_mtime_ns)
+        except OSError:
+            return 0
+        key = f"imported:{os.path.abspath(path)}"
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (key,)).fetchone()
+        if row and row[0] == stamp:
+            return 0
+        profiles = load_json(path, {})
+        with self.db:
+            for name, class_list in profiles.items():
+                if isinstance(class_list, list):
+                    self.db.execute(UPSERT, (name, name.lower(), json.dumps(class_list, ensure_ascii=False)))
+            self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (key, stamp))
+        return len(profiles)
@@ -0,0 +1,232 @@
+import time
+from collections import namedtuple
+
+from .backend import get_backend
+from .executor import DEFAULT_JOBS, ParallelStats, run_parallel, workers_for
+
+StepTiming = namedtuple('StepTiming', 'label elapsed confirmed')
+
+STEP_TIMEOUT = 1.0
+
+
+class ReorganizeReport:
+    """Per-step timings of one reorganize run."""
+
+    def __init__(self):
+        self.steps = []
+        self.total = 0.0
+        self.method = None
+        self.moved = []
+        self.cancelled = False
+        self.parallel = ParallelStats()
+
+    def add(self, label, elapsed, confirmed):
+        self.steps.append(StepTiming(label, elapsed, confirmed))
+
+    @property
+    def timeouts(self):
+        return [step for step in self.steps if not step.confirmed]
+
+    def format(self):
+        lines = [f"{step.label:<32} {step.elapsed * 1000:7.1f} ms{'' if step.confirmed else '  TIMEOUT'}"
+                 for step in self.steps]
+        lines.append(f"{'Total':<32} {self.total * 1000:7.1f} ms ({self.method}, {len(self.moved)} moved)")
+        if self.parallel.workers > 1:
+            lines.append(f"{'Parallel':<32} {self.parallel.format()}")
+        return '\n'.join(lines)
+
+
+def wait_for_desktop(index, backend, wid, desktop, timeout=STEP_TIMEOUT):
+    """Block until wid reports _NET_WM_DESKTOP == desktop; return True if confirmed"""
+    if index is not None and index.live:
+        return index.wait_for(lambda idx: _desktop_of(idx, wid) == desktop, timeout)
+
+    # No event source: poll with a short backoff instead of a fixed sleep
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while True:
+        if backend.get_desktop(wid) == desktop:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def _desktop_of(index, wid):
+    win = index.get(wid)
+    return win.desktop if win else None
+
+
+def longest_increasing_subsequence(values):
+    """Indices (into values) of one longest strictly increasing subsequence"""
+    tails = []
+    tail_idx = []
+    parent = [-1] * len(values)
+    for i, value in enumerate(values):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo:
+            parent[i] = tail_idx[lo - 1]
+        if lo == len(tails):
+            tails.append(value)
+            tail_idx.append(i)
+        else:
+            tails[lo] = value
+            tail_idx[lo] = i
+    result = []
+    i = tail_idx[-1] if tail_idx else -1
+    while i >= 0:
+        result.append(i)
+        i = parent[i]
+    return result[::-1]
+
+
+def plan_moves(current, target, append_only):
+    """
+    Return the items of target that must move so that they end up in target order.
+    current is the present order (items missing from it always move).
+    append_only: a move sends the item to the end (desktop bounce), so only a
+    prefix of target can stay. Otherwise items can be placed next to any sibling
+    (restack), so a longest increasing subsequence stays in place.
+    """
+    pos = {item: i for i, item in enumerate(current)}
+    if append_only:
+        kept = 0
+        last = -1
+        for item in target:
+            if item not in pos or pos[item] < last:
+                break
+            last = pos[item]
+            kept += 1
+        return list(target[kept:])
+
+    present = [item for item in target if item in pos]
+    keep = {present[i] for i in longest_increasing_subsequence([pos[item] for item in present])}
+    return [item for item in target if item not in keep]
+
+
+def pick_method(backend, method='auto'):
+    """
+    'restack' when the WM supports _NET_RESTACK_WINDOW, else 'bounce'.
+    Cinnamon's window list orders buttons by arrival on the desktop, not by
+    stacking, so Muffin always gets the desktop bounce.
+    """
+    if method in ('bounce', 'restack'):
+        return method
+    if not backend.supports('_NET_RESTACK_WINDOW'):
+        return 'bounce'
+    if 'muffin' in (backend.wm_name() or '').lower():
+        return 'bounce'
+    return 'restack'
+
+
+def reorganize_windows(class_list, index, backend=None, step_timeout=STEP_TIMEOUT, progress=None,
+                       method='auto', minimal=True, cancelled=None, jobs=DEFAULT_JOBS):
+    """
+    Reorder Dofus windows to follow class_list, moving as few windows as possible.
+    'bounce' sends misplaced windows to another desktop and back; each move waits
+    for the window manager to confirm the new desktop, with a per-step deadline.
+    'restack' places misplaced windows with _NET_RESTACK_WINDOW and never leaves
+    the desktop. minimal=False moves every window (the original behaviour).
+    progress(message) is called after every step; once cancelled() returns True
+    the run stops waiting and brings bounced windows home. Up to jobs windows
+    leave the desktop at once; the way back is always one by one, in order.
+    Returns a ReorganizeReport.
+    """
+    backend = backend or get_backend()
+    cancelled = cancelled or (lambda: False)
+    if not index.live:
+        index.refresh()
+    report = ReorganizeReport()
+    report.method = pick_method(backend, method)
+    started = time.monotonic()
+
+    windows = index.dofus_windows()
+    ordered = [(name, windows[name]) for name in class_list if name in windows]
+    if not ordered:
+        return report
+
+    current_ws = ordered[0][1].desktop
+    if current_ws is None or current_ws < 0:
+        current_ws = backend.current_desktop() or 0
+    target = [win.wid for _, win in ordered]
+    names = {win.wid: name for name, win in ordered}
+
+    if report.method == 'restack':
+        current = backend.stacking_order()
+        moves = plan_moves(current, target, append_only=False) if minimal else target
+        report.moved = [names[wid] for wid in moves]
+        _restack(backend, target, moves, names, report, progress, cancelled)
+    else:
+        # Taskbars list a desktop's windows by arrival, which the index tracks
+        current = index.taskbar_order(current_ws)
+        moves = plan_moves(current, target, append_only=True) if minimal else target
+        report.moved = [names[wid] for wid in moves]
+        _bounce(index, backend, moves, names, current_ws, step_timeout, report, progress, cancelled,
+                workers_for(backend, jobs))
+        # Every moved window is brought home, in this order, even when cancelled
+        index.record_arrivals(current_ws, moves)
+        if moves:
+            try:
+                index.save_taskbar()
+            except OSError:
+                pass
+
+    report.cancelled = cancelled()
+    report.total = time.monotonic() - started
+    return report
+
+
+def _restack(backend, target, moves, names, report, progress, cancelled):
+    # Moved windows are placed in target order, each right above its predecessor
+    for wid in moves:
+        if cancelled():
+            return
+        begin = time.monotonic()
+        pos = target.index(wid)
+        if pos > 0:
+            done = backend.restack(wid, target[pos - 1], above=True)
+        else:
+            done = backend.restack(wid, target[1], above=False) if len(target) > 1 else True
+        label = f"{names[wid]} restacked"
+        report.add(label, time.monotonic() - begin, done)
+        if progress:
+            progress(label)
+
+
+def _bounce(index, backend, moves, names, current_ws, step_timeout, report, progress, cancelled,
+            workers=1):
+    other_ws = 1 if current_ws == 0 else 0
+
+    def step(label, wid, desktop, begin):
+        confirmed = wait_for_desktop(index, backend, wid, desktop, step_timeout)
+        report.add(label, time.monotonic() - begin, confirmed)
+        if progress:
+            progress(f"{label}{'' if confirmed else ' (timeout)'}")
+
+    def leave(wid):
+        backend.unstick(wid)
+        backend.move_to_desktop(wid, other_ws)
+
+    # Every window can leave at once; only the way back is order-sensitive
+    begin = time.monotonic()
+    run_parallel([lambda wid=wid: leave(wid) for wid in moves], workers, report.parallel)
+    for wid in moves:
+        if cancelled():
+            break
+        step(f"{names[wid]} -> workspace {other_ws}", wid, other_ws, begin)
+
+    for wid in moves:
+        begin = time.monotonic()
+        backend.move_to_desktop(wid, current_ws)
+        if cancelled():
+            # Still bring every window home, just stop waiting for the order
+            continue
+        step(f"{names[wid]} -> workspace {current_ws}", wid, current_ws, begin)
@@ -1,85 +1,314 @@
+import hashlib
+import json
+import os
+
+from .activation import SCRIPT_COMMANDS, configured_method
 from .config import *
-from .utils import make_executable
+from .displays import slug_paths
+from .executor import configured_jobs
+from .teams import load_teams, team_script, team_state_file
+from .workspace import DEFAULT_WORKSPACE_RING
+from .utils import atomic_write
+
+
+def _load_manifest():
+    """
+    name -> {'hash': sha256 of the content, 'inputs': what it was rendered from}.
+    Read from disk every time: the GUI and the CLI both rewrite generated files.
+    """
+    return load_json(SCRIPT_MANIFEST, {})
+
+
+def _file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _write_script(path, content, inputs=None, mode=0o755):
+    """
+    Atomically (re)write a generated file unless it is already up to date.
+    A hotkey firing mid-write sees either the old or the new script, never half.
+    Returns True if the file was written.
+    """
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    # Compared with the file itself, which another process may have rewritten
+    if _file_digest(path) == digest:
+        return False
+    atomic_write(path, content, mode)
+    manifest = _load_manifest()
+    manifest[path.name] = {'hash': digest, 'inputs': inputs or {}}
+    atomic_write(SCRIPT_MANIFEST, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return True
+
+
+def _remove_script(path):
+    """Delete a generated file and its manifest entry"""
+    path.unlink(missing_ok=True)
+    manifest = _load_manifest()
+    if manifest.pop(path.name, None) is not None:
+        atomic_write(SCRIPT_MANIFEST, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+
+def _bounded_jobs():
+    """Bash helper running commands in the background, parallel_jobs at a time"""
+    jobs = configured_jobs(load_json(CONFIG_FILE, {}))
+    return f"""# Independent per-window commands run in the background, {jobs} at a time
+MAX_JOBS={jobs}
+RUNNING=0
+run_bounded() {{
+    if (( RUNNING >= MAX_JOBS )); then
+        wait -n
+        RUNNING=$((RUNNING - 1))
+    fi
+    "$@" &
+    RUNNING=$((RUNNING + 1))
+}}
+"""
 
 
-def generate_rename_script(class_list, workspace=None):
-    """Generate the rename_windows.sh script - exact copy of working script."""
-    classes_str = ' '.join([f"'{c}'" for c in class_list])
+def _bash_array(values):
+    return ' '.join(f"'{value}'" for value in values)
+
+
+def generate_class_file(class_list, by_desktop=None, teams=None):
+    """
+    Initiative order shared by every script, so a reorder rewrites one file.
+    Desktops with their own order (config: class_ini_by_desktop) get CLASS_INI_<n>,
+    teams (config: teams) get TEAM_<name>.
+    """
+    if by_desktop is None or teams is None:
+        config = load_json(CONFIG_FILE, {})
+        if by_desktop is None:
+            by_desktop = config.get('class_ini_by_desktop') or {}
+        if teams is None:
+            teams = load_teams(config)
+    lines = [f"CLASS_INI=({_bash_array(class_list)})"]
+    for desktop, classes in sorted(by_desktop.items()):
+        if str(desktop).isdigit() and classes:
+            lines.append(f"CLASS_INI_{desktop}=({_bash_array(classes)})")
+    for name, team in sorted(teams.items()):
+        lines.append(f"TEAM_{name}=({_bash_array(team.classes)})")
+    script = "# Auto-generated by Dofus Window Manager\n# Initiative order, sourced by the generated scripts\n"
+    script += "\n".join(lines) + "\n"
+    return _write_script(CLASS_FILE, script, {'class_list': list(class_list), 'by_desktop': by_desktop,
+                                              'teams': sorted(teams)}, mode=0o644)
+
+
+def _display_switch(**variables):
+    """
+    Bash pointing each variable at the running $DISPLAY's own file when it is
+    not the session display; variables maps names to DisplayPaths fields.
+    """
+    session = os.environ.get('DISPLAY')
+    if not session:
+        return ""
+    paths = slug_paths(None, '${SLUG}')
+    assignments = ''.join(f'    {name}="{getattr(paths, field)}"\n' for name, field in variables.items())
+    return f"""# Every other X display keeps its own files (displays.display_paths)
+if [[ -n "$DISPLAY" && "$DISPLAY" != "{session}" ]]; then
+    SLUG="${{DISPLAY//[^A-Za-z0-9.]/_}}"
+    while [[ "$SLUG" == *__* ]]; do SLUG="${{SLUG//__/_}}"; done
+    while [[ "$SLUG" == _* ]]; do SLUG="${{SLUG#_}}"; done
+    while [[ "$SLUG" == *_ ]]; do SLUG="${{SLUG%_}}"; done
+    SLUG="${{SLUG:-default}}"
+{assignments}fi
+"""
 
-    bash_script = """#!/bin/bash
-CLASS_LOGIN=(""" + classes_str + """)
-WIN_EXCLUS="Dofus-""" + class_list[0] + """"
 
-# Find all Dofus windows in any workspace
-WINDOWS=($(wmctrl -l | awk '/ Dofus($|-)/ {print $1}'))
+def rename_script_workspace():
+    """Default desktop rename_windows.sh was last generated with (None: every desktop)"""
+    return _load_manifest().get(RENAME_SCRIPT.name, {}).get('inputs', {}).get('workspace')
 
-if [[ ${#WINDOWS[@]} -eq 0 ]]; then
-    echo "No windows in the current workspace ($CURRENT_WS)."
+
+def generate_rename_script(class_list, workspace=None, by_desktop=None):
+    """
+    Generate the rename_windows.sh script. Only windows on workspace are renamed
+    and muted (every desktop when None); `rename_windows.sh N` picks another one.
+    Names follow the identity file shared with actions.rename_windows, so only
+    new clients and drifted titles are renamed.
+    """
+    generate_class_file(class_list, by_desktop)
+    default_ws = '' if workspace is None else str(int(workspace))
+
+    bash_script = """#!/bin/bash
+source \"""" + str(CLASS_FILE) + """\"
+# Desktop to work on ("" = every desktop)
+WORKSPACE="${1-""" + default_ws + """}"
+CLASS_LOGIN=("${CLASS_INI[@]}")
+if [[ -n "$WORKSPACE" ]]; then
+    # This desktop's own initiative order, if it has one
+    DESKTOP_LIST="CLASS_INI_${WORKSPACE}[@]"
+    [[ -n "${!DESKTOP_LIST}" ]] && CLASS_LOGIN=("${!DESKTOP_LIST}")
+fi
+LEADER="${CLASS_LOGIN[0]}"
+IDENTITY_FILE=\"""" + str(IDENTITY_FILE) + """\"
+""" + _display_switch(IDENTITY_FILE='identity_file') + """
+# Client identity: PID and start time read from /proc by the shell (window id
+# when /proc has no answer)
+client_identity() {
+    local STAT FIELDS
+    IDENTITY="wid:$2"
+    { read -r STAT < "/proc/$1/stat"; } 2>/dev/null || return 0
+    read -ra FIELDS <<< "${STAT##*)}"
+    [[ -n "${FIELDS[19]}" ]] && IDENTITY="$1:${FIELDS[19]}"
+}
+
+# One listing gives ids, desktops, PIDs and titles, in client-list order
+DOFUS_RE='(^|[[:space:]])Dofus($|-)'
+DOFUS_NAME_RE='Dofus-([^[:space:]-]+)'
+declare -A LIVE
+WIN_IDS=()
+WIN_PIDS=()
+WIN_TITLES=()
+WIN_IDENTITIES=()
+while read -r WIN_ID WS PID HOST TITLE; do
+    [[ "$TITLE" =~ $DOFUS_RE ]] || continue
+    client_identity "$PID" "$WIN_ID"
+    LIVE[$IDENTITY]=1
+    [[ -n "$WORKSPACE" && "$WS" != "$WORKSPACE" ]] && continue
+    WIN_IDS+=("$WIN_ID")
+    WIN_PIDS+=("$PID")
+    WIN_TITLES+=("$TITLE")
+    WIN_IDENTITIES+=("$IDENTITY")
+done < <(wmctrl -lp)
+
+WHERE="${WORKSPACE:+ on workspace $WORKSPACE}"
+if [[ ${#WIN_IDS[@]} -eq 0 ]]; then
+    echo "No Dofus windows$WHERE."
     exit 0
 fi
 
-echo "Windows on workspace $CURRENT_WS : ${#WINDOWS[@]}"
+echo "Dofus windows$WHERE : ${#WIN_IDS[@]}"
 
-# rename windows with CLASS_LOGIN
-COUNT=0
-for WIN_ID in "${WINDOWS[@]}"; do
-    CLASS_NAME="${CLASS_LOGIN[$COUNT]}"
+# Names: the class remembered for the client, then the class its title
+# carries, then the names left over in initiative order
+declare -A KNOWN WANTED TAKEN
+for NAME in "${CLASS_LOGIN[@]}"; do
+    WANTED[$NAME]=1
+done
+if [[ -r "$IDENTITY_FILE" ]]; then
+    while read -r ID NAME; do
+        [[ -n "$NAME" ]] && KNOWN[$ID]="$NAME"
+    done < "$IDENTITY_FILE"
+fi
+NAMES=()
+claim() {
+    if [[ -n "$2" && -n "${WANTED[$2]}" && -z "${TAKEN[$2]}" ]]; then
+        NAMES[$1]="$2"
+        TAKEN[$2]=1
+    fi
+}
+for ((i=0; i<${#WIN_IDS[@]}; i++)); do
+    claim $i "${KNOWN[${WIN_IDENTITIES[$i]}]}"
+done
+for ((i=0; i<${#WIN_IDS[@]}; i++)); do
+    [[ -z "${NAMES[$i]}" && "${WIN_TITLES[$i]}" =~ $DOFUS_NAME_RE ]] && claim $i "${BASH_REMATCH[1]}"
+done
+FREE=()
+for NAME in "${CLASS_LOGIN[@]}"; do
+    [[ -z "${TAKEN[$NAME]}" ]] && FREE+=("$NAME")
+done
+J=0
+for ((i=0; i<${#WIN_IDS[@]}; i++)); do
+    if [[ -z "${NAMES[$i]}" ]]; then
+        NAMES[$i]="${FREE[$J]}"
+        J=$((J + 1))
+    fi
+done
+
+""" + _bounded_jobs() + """
+# rename windows whose title differs from their name
+declare -A MUTE_PIDS
+SHORT=0
+for ((i=0; i<${#WIN_IDS[@]}; i++)); do
+    CLASS_NAME="${NAMES[$i]}"
+    TITLE="${WIN_TITLES[$i]}"
     if [[ -n "$CLASS_NAME" ]]; then
-        wmctrl -ir "$WIN_ID" -N "Dofus-$CLASS_NAME"
-        echo "Windows renamed : Dofus-$CLASS_NAME"
-    else
+        if [[ "$TITLE" != "Dofus-$CLASS_NAME" ]]; then
+            run_bounded wmctrl -ir "${WIN_IDS[$i]}" -N "Dofus-$CLASS_NAME"
+            echo "Windows renamed : Dofus-$CLASS_NAME"
+        fi
+        TITLE="Dofus-$CLASS_NAME"
+    elif [[ $SHORT -eq 0 ]]; then
+        SHORT=1
         echo "Not enough name in CLASS_LOGIN to rename all windows."
-        break
     fi
-    COUNT=$((COUNT+1))
+    # Followers: every Dofus client of this desktop but the leader
+    if [[ "$TITLE" == *Dofus-* && "$TITLE" != "Dofus-$LEADER" ]]; then
+        MUTE_PIDS["${WIN_PIDS[$i]}"]=1
+    fi
 done
 
 echo "Rename ended."
 
-# Mute all Dofus windows unless WIN_EXCLUS
-wmctrl -l | grep "Dofus-" | grep -v "$WIN_EXCLUS" | while read -r LINE; do
-    WIN_ID=$(echo "$LINE" | awk '{print $1}')
-    PID=$(xprop -id "$WIN_ID" _NET_WM_PID | awk '{print $3}')
-    
-    if [[ -n "$PID" ]]; then
-        # For each sink-input matching the PID --> mute
-        pactl list sink-inputs | \\
-        awk "/Sink Input/ {entry=\\$0} /application.process.id = \\"$PID\\"/ {print entry}" | \\
-        grep "Sink Input" | while read -r ENTRY; do
-            INPUT_ID=$(echo "$ENTRY" | grep -oE '[0-9]+')
-            pactl set-sink-input-mute "$INPUT_ID" 1
-            echo "Windows muted : $WIN_ID (PID $PID, Sink $INPUT_ID)"
-        done
+# Remember who is who; clients that are gone are dropped
+CHANGED=0
+declare -A REMEMBER
+for ID in "${!KNOWN[@]}"; do
+    if [[ -n "${LIVE[$ID]}" ]]; then
+        REMEMBER[$ID]="${KNOWN[$ID]}"
+    else
+        CHANGED=1
     fi
 done
+for ((i=0; i<${#WIN_IDS[@]}; i++)); do
+    ID="${WIN_IDENTITIES[$i]}"
+    if [[ -n "${NAMES[$i]}" && "${REMEMBER[$ID]}" != "${NAMES[$i]}" ]]; then
+        REMEMBER[$ID]="${NAMES[$i]}"
+        CHANGED=1
+    fi
+done
+if [[ $CHANGED -eq 1 ]]; then
+    for ID in "${!REMEMBER[@]}"; do
+        echo "$ID ${REMEMBER[$ID]}"
+    done > "$IDENTITY_FILE.$$" && mv -f "$IDENTITY_FILE.$$" "$IDENTITY_FILE"
+fi
+
+# Mute the followers from one sink-input snapshot
+INPUT_ID=""
+MUTED=""
+while IFS= read -r LINE; do
+    if [[ "$LINE" =~ ^Sink\\ Input\\ \\#([0-9]+) ]]; then
+        INPUT_ID="${BASH_REMATCH[1]}"
+    elif [[ "$LINE" =~ Mute:\\ (yes|no) ]]; then
+        MUTED="${BASH_REMATCH[1]}"
+    elif [[ "$LINE" =~ application\\.process\\.id\\ =\\ \\"([0-9]+)\\" ]]; then
+        PID="${BASH_REMATCH[1]}"
+        if [[ -n "${MUTE_PIDS[$PID]}" && "$MUTED" != "yes" ]]; then
+            run_bounded pactl set-sink-input-mute "$INPUT_ID" 1
+            echo "Windows muted : PID $PID, Sink $INPUT_ID"
+        fi
+    fi
+done < <(LC_ALL=C pactl list sink-inputs)
+wait
 
 echo "Muting ended."
 """
 
-    RENAME_SCRIPT.write_text(bash_script)
-    make_executable(RENAME_SCRIPT)
+    return _write_script(RENAME_SCRIPT, bash_script, {'workspace': workspace})
 
 
 def generate_reorganize_script(class_list):
     """Generate script to reorganize windows in taskbar by moving through workspaces."""
-    classes_str = ' '.join([f"'{c}'" for c in class_list])
-    
+    generate_class_file(class_list)
+
     bash_script = """#!/bin/bash
 # Auto-generated by Dofus Window Manager
 # Reorder windows by moving them to another workspace then back
 
-CLASS_ORDER=(""" + classes_str + """)
+source \"""" + str(CLASS_FILE) + """\"
+CLASS_ORDER=("${CLASS_INI[@]}")
 
 echo "Scanning for Dofus windows..."
 
 declare -A window_ids
 declare -A window_workspaces
 
-while IFS= read -r line; do
-    WIN_ID=$(echo "$line" | awk '{print $1}')
-    WS=$(echo "$line" | awk '{print $2}')
-    TITLE=$(echo "$line" | awk '{print $NF}')
-    
+# Fields split by the shell itself: no echo | awk per window
+while read -r WIN_ID WS _ TITLE; do
     if [[ "$TITLE" =~ Dofus-([A-Za-z]+) ]]; then
         CLASS="${BASH_REMATCH[1]}"
         window_ids["$CLASS"]="$WIN_ID"
@@ -107,15 +336,42 @@ fi
 
 echo "Using workspace $OTHER_WS as temporary"
 
-echo "Moving all windows to temporary workspace..."
-for class in "${!window_ids[@]}"; do
+# Wait until a window reports the wanted _NET_WM_DESKTOP instead of sleeping a fixed time
+STEP_TIMEOUT_US=1000000
+wait_desktop() {
+    local win="$1" ws="$2" start="${EPOCHREALTIME//[.,]/}" now
+    while [[ "$(xprop -id "$win" _NET_WM_DESKTOP 2>/dev/null)" != *" = $ws" ]]; do
+        now="${EPOCHREALTIME//[.,]/}"
+        if (( now - start > STEP_TIMEOUT_US )); then
+            echo "  timeout after $(( (now - start) / 1000 )) ms"
+            return 1
+        fi
+        sleep 0.01
+    done
+    now="${EPOCHREALTIME//[.,]/}"
+    echo "  confirmed in $(( (now - start) / 1000 )) ms"
+}
+
+""" + _bounded_jobs() + """
+move_away() {
+    wmctrl -ir "$1" -b "remove,sticky" 2>/dev/null
+    wmctrl -ir "$1" -t "$OTHER_WS" 2>/dev/null
+}
+
+# Windows leave in any order; only the way back is order-sensitive
+echo "Moving windows to temporary workspace..."
+for class in "${CLASS_ORDER[@]}"; do
     WIN_ID="${window_ids["$class"]}"
-    wmctrl -ir "$WIN_ID" -b "remove,sticky" 2>/dev/null
-    wmctrl -ir "$WIN_ID" -t "$OTHER_WS" 2>/dev/null
-    sleep 0.1
+    [[ -z "$WIN_ID" ]] && continue
+    run_bounded move_away "$WIN_ID"
+done
+wait
+for class in "${CLASS_ORDER[@]}"; do
+    WIN_ID="${window_ids["$class"]}"
+    [[ -z "$WIN_ID" ]] && continue
+    echo "$class -> workspace $OTHER_WS"
+    wait_desktop "$WIN_ID" "$OTHER_WS"
 done
-
-sleep 0.5
 
 echo "Moving windows back in correct order..."
 
@@ -126,112 +382,234 @@ for idx in "${!CLASS_ORDER[@]}"; do
     if [[ -n "$WIN_ID" ]]; then
         echo "Moving $CLASS back to workspace $CURRENT_WS"
         wmctrl -ir "$WIN_ID" -t "$CURRENT_WS" 2>/dev/null
-        sleep 0.2
+        wait_desktop "$WIN_ID" "$CURRENT_WS"
     fi
 done
 
 echo "Done - windows reordered in taskbar"
 """
     
-    REORGANIZE_SCRIPT.write_text(bash_script)
-    make_executable(REORGANIZE_SCRIPT)
-
-
-def generate_cycle_forward(class_list):
-    """Generate cycle forward script"""
-    classes_str = ' '.join([f"'{c}'" for c in class_list])
+    return _write_script(REORGANIZE_SCRIPT, bash_script)
+
+
+def _cycle_script(class_list, command, step, team=None, method=None):
+    """
+    Cycle script for one direction (of one team); returns (content, activation method).
+    method defaults to the one in config.json on disk.
+    """
+    generate_class_file(class_list)
+    method = method or configured_method(load_json(CONFIG_FILE, {}))
+    activate = SCRIPT_COMMANDS[method]
+    classes = ''
+    team_state = ''
+    skip_desktop = ''
+    if team is not None:
+        # Own order, position and queue; only the team's desktop is looked at
+        command = f"{command}:{team.name}"
+        classes = f'CLASS_INI=("${{TEAM_{team.name}[@]}}")\n'
+        team_state = f'STATE_FILE="{team_state_file(team.name, "$STATE_FILE")}"\n'
+        if team.desktop is not None:
+            skip_desktop = f'    [[ "$WS" != "{team.desktop}" ]] && continue\n'
+    displays = _display_switch(STATE_FILE='state_file', FIFO='fifo', PIDFILE='pidfile', SOCKET='socket')
     script = f"""#!/bin/bash
 # Auto-generated by Dofus Window Manager
 
-CLASS_INI=({classes_str})
-STATE_FILE="/tmp/dofus_window_index"
+source "{CLASS_FILE}"
+{classes}STATE_FILE="{CYCLE_STATE_FILE}"
+FIFO="{CYCLE_FIFO}"
+PIDFILE="{DAEMON_PIDFILE}"
+SOCKET="{DAEMON_SOCKET}"
+{displays}{team_state}PENDING_FILE="$STATE_FILE.pending"
+STEP={step}
+
+# Fast path: queue the press for the resident daemon (main.py --daemon) without
+# forking; the daemon applies a burst of presses as a single jump
+if [[ -p "$FIFO" ]] && read -r PID 2>/dev/null < "$PIDFILE" && [[ -e /proc/$PID ]]; then
+    echo {command} 1<> "$FIFO"
+    exit 0
+fi
+if [[ -S "$SOCKET" ]]; then
+    python3 -I -S "{CYCLE_CLIENT}" --socket "$SOCKET" {command}
+    STATUS=$?
+    [[ $STATUS -ne 2 ]] && exit $STATUS
+fi
+
+# No daemon: one instance at a time. A press that finds the lock taken is queued
+# for the holder, which applies all queued presses as one jump
+exec 9>> "$STATE_FILE.lock"
+if ! flock -n 9; then
+    echo "$STEP" >> "$PENDING_FILE"
+    # Unless the holder is already past its last look at the queue
+    flock -w 0.05 9 || exit 0
+    STEP=0
+fi
 
-AVAILABLE=($(wmctrl -l | grep "Dofus-" | awk '{{print $4}}' | cut -d'-' -f2))
+# One window listing; class -> window id table built in pure bash (no extra forks)
+declare -A WIN_OF
+while read -r WIN_ID WS HOST TITLE; do
+{skip_desktop}    if [[ "$TITLE" =~ Dofus-([^[:space:]-]+) && -z "${{WIN_OF[${{BASH_REMATCH[1]}}]}}" ]]; then
+        WIN_OF["${{BASH_REMATCH[1]}}"]="$WIN_ID"
+    fi
+done < <(wmctrl -l)
 
-if [[ ${{#AVAILABLE[@]}} -eq 0 ]]; then
+if [[ ${{#WIN_OF[@]}} -eq 0 ]]; then
+    : > "$PENDING_FILE"
     echo "No window detected."
     exit 1
 fi
 
-if [ -f "$STATE_FILE" ]; then
-    INDEX=$(cat "$STATE_FILE")
-else
-    INDEX=0
-fi
+INDEX=0
+[[ -f "$STATE_FILE" ]] && read -r INDEX < "$STATE_FILE"
+[[ "$INDEX" =~ ^[0-9]+$ ]] || INDEX=0
 
 TOTAL=${{#CLASS_INI[@]}}
-for ((i=1; i<=TOTAL; i++)); do
-    NEXT=$(( (INDEX + i) % TOTAL ))
-    CLASS_NAME=${{CLASS_INI[$NEXT]}}
-    if printf '%s\\n' "${{AVAILABLE[@]}}" | grep -q "^$CLASS_NAME$"; then
-        wmctrl -a "Dofus-$CLASS_NAME"
-        echo "$NEXT" > "$STATE_FILE"
-        echo "Switch to Dofus-$CLASS_NAME"
-        exit 0
-    fi
+COUNT=0
+for CLASS_NAME in "${{CLASS_INI[@]}}"; do
+    [[ -n "${{WIN_OF[$CLASS_NAME]}}" ]] && COUNT=$((COUNT + 1))
 done
+if [[ $COUNT -eq 0 ]]; then
+    : > "$PENDING_FILE"
+    echo "No windows has been found."
+    exit 1
+fi
 
-echo "No windows has been found."
+while true; do
+    # Claimed by renaming it: a press queued meanwhile starts a new file
+    if [[ -s "$PENDING_FILE" ]] && mv "$PENDING_FILE" "$PENDING_FILE.$$" 2>/dev/null; then
+        while read -r QUEUED; do
+            [[ "$QUEUED" =~ ^-?[0-9]+$ ]] && STEP=$((STEP + QUEUED))
+        done < "$PENDING_FILE.$$"
+        rm -f "$PENDING_FILE.$$"
+    fi
+    if [[ $STEP -ne 0 ]]; then
+        DIR=$(( STEP > 0 ? 1 : -1 ))
+        LEFT=$(( (STEP * DIR - 1) % COUNT + 1 ))
+        for ((i=1; i<=TOTAL; i++)); do
+            NEXT=$(( ((INDEX + DIR * i) % TOTAL + TOTAL) % TOTAL ))
+            CLASS_NAME=${{CLASS_INI[$NEXT]}}
+            WIN_ID="${{WIN_OF[$CLASS_NAME]}}"
+            [[ -z "$WIN_ID" ]] && continue
+            LEFT=$((LEFT - 1))
+            if [[ $LEFT -eq 0 ]]; then
+                {activate}
+                INDEX=$NEXT
+                echo "$INDEX" > "$STATE_FILE"
+                echo "Switch to Dofus-$CLASS_NAME"
+                break
+            fi
+        done
+    fi
+    STEP=0
+    [[ -s "$PENDING_FILE" ]] || break
+done
 """
-    CYCLE_FORWARD.write_text(script)
-    make_executable(CYCLE_FORWARD)
+    return script, method
+
+
+def generate_cycle_forward(class_list, method=None):
+    """Generate cycle forward script"""
+    script, method = _cycle_script(class_list, 'next', 1, method=method)
+    generate_cycle_client()
+    return _write_script(CYCLE_FORWARD, script, {'activation': method})
 
 
-def generate_cycle_backward(class_list):
+def generate_cycle_backward(class_list, method=None):
     """Generate cycle backward script"""
-    classes_str = ' '.join([f"'{c}'" for c in class_list])
-    script = f"""#!/bin/bash
+    script, method = _cycle_script(class_list, 'prev', -1, method=method)
+    generate_cycle_client()
+    return _write_script(CYCLE_BACKWARD, script, {'activation': method})
+
+
+def generate_team_scripts(class_list, teams=None, method=None):
+    """
+    cycle_forward_<team>.sh / cycle_backward_<team>.sh for every team in
+    config.json; scripts of teams that no longer exist are removed.
+    Returns the paths written or removed.
+    """
+    if teams is None:
+        teams = load_teams(load_json(CONFIG_FILE, {}))
+    changed = []
+    wanted = set()
+    for team in teams.values():
+        for direction, command, step in (('forward', 'next', 1), ('backward', 'prev', -1)):
+            path = team_script(team.name, direction)
+            wanted.add(path.name)
+            script, used = _cycle_script(class_list, command, step, team, method)
+            if _write_script(path, script, {'activation': used, 'team': team.name}):
+                changed.append(path)
+    if teams:
+        generate_cycle_client()
+    for pattern in ('cycle_forward_*.sh', 'cycle_backward_*.sh'):
+        for path in SCRIPT_DIR.glob(pattern):
+            if path.name not in wanted:
+                _remove_script(path)
+                changed.append(path)
+    return changed
+
+
+def generate_cycle_client():
+    """Generate the tiny socket client used by the cycle scripts to reach the daemon"""
+    script = f"""#!/usr/bin/env python3
 # Auto-generated by Dofus Window Manager
+# Exit codes: 0 switched, 1 daemon error, 2 daemon unreachable
+import socket
+import sys
+
+# --socket PATH: the daemon of another display
+args = sys.argv[1:]
+path = "{DAEMON_SOCKET}"
+if args[:1] == ["--socket"]:
+    path, args = args[1], args[2:]
+try:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1.0)
+    sock.connect(path)
+    sock.sendall((" ".join(args) + "\\n").encode())
+    reply = sock.makefile().readline().strip()
+except OSError:
+    sys.exit(2)
+
+print(reply)
+sys.exit(0 if reply.startswith("ok") else 1)
+"""
+    return _write_script(CYCLE_CLIENT, script)
 
-CLASS_INI=({classes_str})
-STATE_FILE="/tmp/dofus_window_index"
 
-AVAILABLE=($(wmctrl -l | grep "Dofus-" | awk '{{print $4}}' | cut -d'-' -f2))
+def generate_toggle_workspace(ring=None):
+    """Generate toggle workspace script: next desktop of the ring (0 <-> 1 by default)"""
+    if ring is None:
+        ring = load_json(CONFIG_FILE, {}).get('workspace_ring') or DEFAULT_WORKSPACE_RING
+    ring = [int(num) for num in ring]
+    ring_str = ' '.join(str(num) for num in ring)
+    script = f"""#!/bin/bash
+# Auto-generated by Dofus Window Manager
 
-if [[ ${{#AVAILABLE[@]}} -eq 0 ]]; then
-    echo "No window detected."
-    exit 1
+RING=({ring_str})
+FIFO="{CYCLE_FIFO}"
+PIDFILE="{DAEMON_PIDFILE}"
+{_display_switch(FIFO='fifo', PIDFILE='pidfile')}
+# The daemon keeps the current desktop cached: hand the press over without forking
+if [[ -p "$FIFO" ]] && read -r PID 2>/dev/null < "$PIDFILE" && [[ -e /proc/$PID ]]; then
+    echo workspace 1<> "$FIFO"
+    exit 0
 fi
 
-if [ -f "$STATE_FILE" ]; then
-    INDEX=$(cat "$STATE_FILE")
-else
-    INDEX=0
-fi
+CURRENT_WS=""
+while read -r NUM FLAG REST; do
+    [[ "$FLAG" == "*" ]] && CURRENT_WS=$NUM
+done < <(wmctrl -d)
 
-TOTAL=${{#CLASS_INI[@]}}
-for ((i=1; i<=TOTAL; i++)); do
-    NEXT=$(( (INDEX - i + TOTAL) % TOTAL ))
-    CLASS_NAME=${{CLASS_INI[$NEXT]}}
-    if printf '%s\\n' "${{AVAILABLE[@]}}" | grep -q "^$CLASS_NAME$"; then
-        wmctrl -a "Dofus-$CLASS_NAME"
-        echo "$NEXT" > "$STATE_FILE"
-        echo "Switch to Dofus-$CLASS_NAME"
-        exit 0
+TARGET=${{RING[0]}}
+for ((i=0; i<${{#RING[@]}}; i++)); do
+    if [[ "${{RING[$i]}}" == "$CURRENT_WS" ]]; then
+        TARGET=${{RING[$(( (i + 1) % ${{#RING[@]}} ))]}}
+        break
     fi
 done
 
-echo "No windows has been found."
-"""
-    CYCLE_BACKWARD.write_text(script)
-    make_executable(CYCLE_BACKWARD)
-
-
-def generate_toggle_workspace():
-    """Generate toggle workspace script"""
-    script = """#!/bin/bash
-# Auto-generated by Dofus Window Manager
-
-CURRENT_WS=$(wmctrl -d | awk '$2 == "*" {print $1}')
-
-if [ "$CURRENT_WS" -eq 0 ]; then
-    wmctrl -s 1
-else
-    wmctrl -s 0
-fi
+[[ "$TARGET" != "$CURRENT_WS" ]] && wmctrl -s "$TARGET"
 """
-    TOGGLE_WORKSPACE.write_text(script)
-    make_executable(TOGGLE_WORKSPACE)
+    return _write_script(TOGGLE_WORKSPACE, script, {'ring': ring})
 
 
 def generate_space_cycle_forward():
@@ -244,8 +622,7 @@ xdotool key space
 
 "{CYCLE_FORWARD}"
 """
-    SPACE_CYCLE_FORWARD.write_text(script)
-    make_executable(SPACE_CYCLE_FORWARD)
+    return _write_script(SPACE_CYCLE_FORWARD, script)
 
 
 def generate_click_cycle():
@@ -257,5 +634,19 @@ xdotool click 1
 
 "{CYCLE_FORWARD}"
 """
-    CLICK_CYCLE_FORWARD.write_text(script)
-    make_executable(CLICK_CYCLE_FORWARD)
\ No newline at end of file
+    return _write_script(CLICK_CYCLE_FORWARD, script)
+
+
+def generate_all_scripts(class_list, workspace=None):
+    """Regenerate every script; return the paths that actually changed"""
+    before = {name: entry.get('hash') for name, entry in _load_manifest().items()}
+    generate_rename_script(class_list, workspace)
+    generate_reorganize_script(class_list)
+    generate_cycle_forward(class_list)
+    generate_cycle_backward(class_list)
+    generate_toggle_workspace()
+    generate_space_cycle_forward()
+    generate_click_cycle()
+    removed = [path for path in generate_team_scripts(class_list) if not path.exists()]
+    return [SCRIPT_DIR / name for name, entry in _load_manifest().items()
+            if before.get(name) != entry.get('hash')] + removed
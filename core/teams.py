@@ -0,0 +1,58 @@
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from .config import CYCLE_STATE_FILE, SCRIPT_DIR
+
+# A team is cycled on its own: its order, state file, scripts and hotkeys.
+# desktop=None means the team's classes are looked up on every desktop.
+Team = namedtuple('Team', 'name classes desktop hotkeys')
+
+# Used in file names, bash variable names and the daemon protocol
+TEAM_NAME = re.compile(r'^[A-Za-z0-9_]+$')
+
+# Team hotkeys map these actions to 'cycle_next:<team>' / 'cycle_prev:<team>'
+TEAM_ACTIONS = ('cycle_next', 'cycle_prev')
+
+
+def load_teams(config):
+    """{name: Team} from config['teams']; entries with a bad name or no classes are skipped"""
+    teams = {}
+    for name, entry in (config.get('teams') or {}).items():
+        if not TEAM_NAME.match(name) or not isinstance(entry, dict) or not entry.get('classes'):
+            continue
+        desktop = entry.get('desktop')
+        teams[name] = Team(name, list(entry['classes']),
+                           int(desktop) if desktop is not None else None,
+                           dict(entry.get('hotkeys') or {}))
+    return teams
+
+
+def team_entry(classes, desktop=None, hotkeys=None):
+    """config['teams'][name] value for a team"""
+    entry = {'classes': list(classes)}
+    if desktop is not None:
+        entry['desktop'] = int(desktop)
+    if hotkeys:
+        entry['hotkeys'] = dict(hotkeys)
+    return entry
+
+
+def team_state_file(name, state_file=CYCLE_STATE_FILE):
+    """Cycle position of one team, next to the ring's own state file"""
+    return Path(f"{state_file}.{name}")
+
+
+def team_script(name, direction):
+    """cycle_forward_<name>.sh / cycle_backward_<name>.sh"""
+    return SCRIPT_DIR / f"cycle_{direction}_{name}.sh"
+
+
+def team_hotkeys(teams):
+    """Hotkey bindings of every team, keyed 'cycle_next:<team>'"""
+    bindings = {}
+    for team in teams.values():
+        for action in TEAM_ACTIONS:
+            if team.hotkeys.get(action):
+                bindings[f"{action}:{team.name}"] = team.hotkeys[action]
+    return bindings
@@ -1,5 +1,10 @@
 import os
+import re
 import subprocess
+import tempfile
+
+DOFUS_TITLE = re.compile(r'Dofus-([^\s-]+)')
+DOFUS_CLIENT = re.compile(r'(^|\s)Dofus($|-)')
 
 
 def make_executable(path):
@@ -9,10 +14,50 @@ def make_executable(path):
         pass
 
 
-def run_cmd(cmd, timeout=5):
+def atomic_write(path, content, mode=0o644, fsync=False):
+    """Write content to a temp file with its final mode, then rename it over path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            os.fchmod(f.fileno(), mode)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def run_cmd(cmd, timeout=5, env=None):
     """Execute a command and return (stdout, stderr, returncode)"""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=env)
         return result.stdout.strip(), result.stderr.strip(), result.returncode
     except Exception as e:
-        return "", str(e), 1
\ No newline at end of file
+        return "", str(e), 1
+
+
+def dofus_class(title):
+    """Return the class name from a 'Dofus-<Class>' window title, or None"""
+    match = DOFUS_TITLE.search(title)
+    return match.group(1) if match else None
+
+
+def is_dofus_title(title):
+    """True for Dofus client titles, renamed ('Dofus-Cra') or not ('Dofus')"""
+    return bool(DOFUS_CLIENT.search(title))
+
+
+def close_pipe(pipe):
+    """Close both ends of an os.pipe() (None is ignored)"""
+    for fd in pipe or ():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
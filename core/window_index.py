@@ -0,0 +1,344 @@
+import os
+import select
+import threading
+from collections import namedtuple
+
+from .backend import HAS_XLIB, XlibBackend, get_backend
+from .config import load_json, write_json
+from .displays import display_paths
+from .utils import close_pipe, dofus_class, is_dofus_title
+
+if HAS_XLIB:
+    from Xlib import X, Xatom
+
+# Workspace layout: desktop names (count = len(names)), the current desktop and
+# {desktop: number of Dofus clients}
+Topology = namedtuple('Topology', 'names current dofus')
+
+DESKTOP_ATOMS = ('_NET_NUMBER_OF_DESKTOPS', '_NET_DESKTOP_NAMES', '_NET_CURRENT_DESKTOP')
+
+
+class WindowIndex:
+    """
+    In-memory view of the client list, kept current from X PropertyNotify events.
+    Lookups by window id, class, PID or desktop are dict reads and never scan.
+    Without python-xlib there are no events: call refresh() when the view is stale.
+    """
+
+    def __init__(self, backend=None, display_name=None):
+        self.backend = backend or get_backend()
+        self.display_name = display_name
+        # wid -> Window in _NET_CLIENT_LIST order; secondary maps hold wid sets
+        self.windows = {}
+        self.by_class = {}
+        self.by_pid = {}
+        self.by_desktop = {}
+        # desktop -> wids in arrival order, the order taskbars list their buttons in;
+        # unlike by_desktop it survives title changes and refresh()
+        self.arrivals = {}
+        self.taskbar_file = display_paths(display_name).taskbar_file
+        self.active = None
+        self.desktop_names = []
+        self.current_desktop = None
+        self.listeners = []
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._thread = None
+        self._wake = None
+
+    @property
+    def live(self):
+        """True when the index follows X events instead of explicit refreshes"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Load the current clients and start following events when possible"""
+        self.refresh()
+        if HAS_XLIB and isinstance(self.backend, XlibBackend) and self._thread is None:
+            self._wake = os.pipe()
+            self._thread = threading.Thread(target=self._event_loop, name='window-index', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._wake is not None:
+            os.write(self._wake[1], b'x')
+        if self._thread is not None:
+            self._thread.join(1.0)
+            if self._thread.is_alive():
+                # Still inside select() on the pipe: leave it open rather than race it
+                return
+        self._thread = None
+        close_pipe(self._wake)
+        self._wake = None
+
+    def refresh(self):
+        """Rebuild the whole index from one client listing"""
+        windows = self.backend.list_windows()
+        active = self.backend.active_window()
+        names, current = self.backend.desktop_layout()
+        with self._lock:
+            arrivals = {desktop: list(wids) for desktop, wids in self.arrivals.items()}
+            if not arrivals:
+                # Cold start: X only knows the mapping order, the last run knew better
+                arrivals = self._saved_arrivals()
+            for wid in list(self.windows):
+                self._remove(wid)
+            self.arrivals = {}
+            for win in windows:
+                self._add(win)
+            # Windows still on the same desktop keep their place, new ones come last
+            for desktop, wids in self.arrivals.items():
+                kept = [wid for wid in arrivals.get(desktop, ()) if wid in wids]
+                self.arrivals[desktop] = dict.fromkeys(kept + list(wids))
+            self.active = active
+            self.desktop_names = names
+            self.current_desktop = current
+            self._changed.notify_all()
+        self._notify('refresh', None)
+
+    # === LOOKUPS ===
+    def get(self, wid):
+        with self._lock:
+            return self.windows.get(wid)
+
+    def window_for_class(self, name):
+        with self._lock:
+            wids = self.by_class.get(name)
+            return self.windows[next(iter(wids))] if wids else None
+
+    def windows_for_pid(self, pid):
+        with self._lock:
+            return [self.windows[wid] for wid in self.by_pid.get(pid, ())]
+
+    def windows_on_desktop(self, desktop):
+        with self._lock:
+            return [self.windows[wid] for wid in self.by_desktop.get(desktop, ())]
+
+    def taskbar_order(self, desktop):
+        """Window ids on desktop in the order they arrived there"""
+        with self._lock:
+            return [wid for wid in self.arrivals.get(desktop, ()) if wid in self.windows]
+
+    def record_arrivals(self, desktop, wids):
+        """wids were just moved to desktop, in this order (for indexes without events)"""
+        with self._lock:
+            for wid in wids:
+                self._arrive(wid, desktop)
+
+    def save_taskbar(self):
+        """Keep the arrival order for the next cold index (CLI runs, a restarted daemon)"""
+        with self._lock:
+            order = {str(desktop): list(wids) for desktop, wids in self.arrivals.items() if wids}
+        write_json(self.taskbar_file, order)
+
+    def _saved_arrivals(self):
+        try:
+            return {int(desktop): [int(wid) for wid in wids]
+                    for desktop, wids in load_json(self.taskbar_file, {}).items()}
+        except (AttributeError, TypeError, ValueError):
+            return {}
+
+    def dofus_windows(self, desktop=None):
+        """Return {class: Window} for renamed Dofus clients, optionally on one desktop"""
+        with self._lock:
+            result = {}
+            for name, wids in self.by_class.items():
+                for wid in wids:
+                    win = self.windows[wid]
+                    if desktop is None or win.desktop == desktop:
+                        result[name] = win
+                        break
+            return result
+
+    def class_windows(self, classes, desktop=None):
+        """{class: Window} for the given classes only: one lookup per class, no scan"""
+        with self._lock:
+            result = {}
+            for name in classes:
+                for wid in self.by_class.get(name, ()):
+                    win = self.windows[wid]
+                    if desktop is None or win.desktop == desktop:
+                        result[name] = win
+                        break
+            return result
+
+    def game_windows(self, desktop=None):
+        """Dofus clients, renamed or not, in _NET_CLIENT_LIST order"""
+        with self._lock:
+            wids = self.windows if desktop is None else self.by_desktop.get(desktop, {})
+            return [self.windows[wid] for wid in wids if is_dofus_title(self.windows[wid].title)]
+
+    def all_windows(self):
+        """Clients in _NET_CLIENT_LIST order"""
+        with self._lock:
+            return list(self.windows.values())
+
+    def workspaces(self):
+        """[(num, name)] like backend.get_workspaces(), from the cache"""
+        with self._lock:
+            return [(str(i), name) for i, name in enumerate(self.desktop_names)]
+
+    def topology(self):
+        """Snapshot of the workspace layout with per-desktop Dofus counts"""
+        with self._lock:
+            dofus = {}
+            for desktop, wids in self.by_desktop.items():
+                count = sum(1 for wid in wids if is_dofus_title(self.windows[wid].title))
+                if count:
+                    dofus[desktop] = count
+            return Topology(list(self.desktop_names), self.current_desktop, dofus)
+
+    def wait_for(self, predicate, timeout):
+        """Block until predicate(self) is true or timeout expires; return the result"""
+        with self._changed:
+            return self._changed.wait_for(lambda: predicate(self), timeout)
+
+    def add_listener(self, callback):
+        """callback(kind, wid) runs on the event thread after every change"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    # === DELTAS ===
+    def _add(self, win):
+        self.windows[win.wid] = win
+        self._index(win)
+        self._arrive(win.wid, win.desktop)
+
+    def _remove(self, wid):
+        win = self.windows.pop(wid, None)
+        if win is not None:
+            self._unindex(win)
+            _discard(self.arrivals, win.desktop, wid)
+        return win
+
+    def _arrive(self, wid, desktop):
+        for wids in self.arrivals.values():
+            wids.pop(wid, None)
+        self.arrivals.setdefault(desktop, {})[wid] = None
+
+    def _replace(self, wid, **changes):
+        # Update in place so the dict keeps _NET_CLIENT_LIST order
+        with self._lock:
+            old = self.windows.get(wid)
+            if old is None:
+                return
+            new = old._replace(**changes)
+            self._unindex(old)
+            self.windows[wid] = new
+            self._index(new)
+            if new.desktop != old.desktop:
+                # Only a move changes the taskbar: a new title keeps the button in place
+                self._arrive(wid, new.desktop)
+            self._changed.notify_all()
+
+    def _index(self, win):
+        name = dofus_class(win.title)
+        if name:
+            self.by_class.setdefault(name, {})[win.wid] = None
+        if win.pid:
+            self.by_pid.setdefault(win.pid, {})[win.wid] = None
+        self.by_desktop.setdefault(win.desktop, {})[win.wid] = None
+
+    def _unindex(self, win):
+        name = dofus_class(win.title)
+        if name:
+            _discard(self.by_class, name, win.wid)
+        if win.pid:
+            _discard(self.by_pid, win.pid, win.wid)
+        _discard(self.by_desktop, win.desktop, win.wid)
+
+    def _notify(self, kind, wid):
+        for callback in list(self.listeners):
+            try:
+                callback(kind, wid)
+            except Exception:
+                pass
+
+    # === EVENTS ===
+    def _event_loop(self):
+        reader = XlibBackend(self.display_name)
+        disp = reader.display
+        atoms = {name: reader.atom(name) for name in (
+            '_NET_CLIENT_LIST', '_NET_ACTIVE_WINDOW', '_NET_WM_NAME', '_NET_WM_DESKTOP') + DESKTOP_ATOMS}
+        desktop_atoms = {atoms[name] for name in DESKTOP_ATOMS}
+        reader.root.change_attributes(event_mask=X.PropertyChangeMask)
+        for wid in reader.client_list():
+            self._watch(reader, wid)
+        # Catch anything that changed between refresh() and the subscription
+        self._sync_clients(reader)
+
+        while True:
+            while disp.pending_events():
+                ev = disp.next_event()
+                if ev.type == X.PropertyNotify:
+                    self._on_property(reader, atoms, desktop_atoms, ev)
+            readable, _, _ = select.select([disp.fileno(), self._wake[0]], [], [])
+            if self._wake[0] in readable:
+                disp.close()
+                return
+
+    def _watch(self, reader, wid):
+        try:
+            reader._window(wid).change_attributes(event_mask=X.PropertyChangeMask)
+        except Exception:
+            pass
+
+    def _sync_clients(self, reader):
+        current = reader.client_list()
+        with self._lock:
+            known = set(self.windows)
+        added = [wid for wid in current if wid not in known]
+        removed = known.difference(current)
+        for wid in added:
+            self._watch(reader, wid)
+        new_windows = [reader.get_window(wid) for wid in added]
+        with self._lock:
+            for wid in removed:
+                self._remove(wid)
+            for win in new_windows:
+                self._add(win)
+            self._changed.notify_all()
+        for wid in removed:
+            self._notify('removed', wid)
+        for wid in added:
+            self._notify('added', wid)
+
+    def _on_property(self, reader, atoms, desktop_atoms, ev):
+        wid = ev.window.id
+        if wid == reader.root.id:
+            if ev.atom == atoms['_NET_CLIENT_LIST']:
+                self._sync_clients(reader)
+            elif ev.atom == atoms['_NET_ACTIVE_WINDOW']:
+                active = reader.active_window()
+                with self._lock:
+                    self.active = active
+                    self._changed.notify_all()
+                self._notify('active', active)
+            elif ev.atom in desktop_atoms:
+                names, current = reader.desktop_layout()
+                with self._lock:
+                    self.desktop_names = names
+                    self.current_desktop = current
+                    self._changed.notify_all()
+                self._notify('desktops', None)
+        elif ev.atom in (atoms['_NET_WM_NAME'], Xatom.WM_NAME):
+            self._replace(wid, title=reader.get_title(wid))
+            self._notify('title', wid)
+        elif ev.atom == atoms['_NET_WM_DESKTOP']:
+            desktop = reader.get_desktop(wid)
+            self._replace(wid, desktop=desktop if desktop is not None else -1)
+            self._notify('desktop', wid)
+
+
+def _discard(mapping, key, wid):
+    # Index values are dicts used as insertion-ordered sets
+    values = mapping.get(key)
+    if values is None:
+        return
+    values.pop(wid, None)
+    if not values:
+        del mapping[key]
@@ -1,19 +1,42 @@
-import subprocess
+from .backend import get_backend
+from .config import DEFAULT_CLASS_INI
 
+# Desktops visited by the workspace toggle, in order (config.json: workspace_ring)
+DEFAULT_WORKSPACE_RING = [0, 1]
 
-def get_workspaces():
-    """Return list of (num, name) tuples for workspaces using wmctrl."""
-    try:
-        result = subprocess.run(['wmctrl', '-d'], capture_output=True, text=True, timeout=2)
-        if result.returncode == 0:
-            workspaces = []
-            for line in result.stdout.strip().split('\n'):
-                parts = line.split(None, 9)
-                if len(parts) >= 10:
-                    ws_num = parts[0]
-                    ws_name = parts[9]
-                    workspaces.append((ws_num, ws_name))
-            return workspaces
-        return []
-    except Exception:
-        return []
\ No newline at end of file
+
+def next_in_ring(current, ring, step=1):
+    """Desktop step places after current in ring; ring[0] when current is not in it"""
+    if not ring:
+        return current
+    if current not in ring:
+        return ring[0]
+    return ring[(ring.index(current) + step) % len(ring)]
+
+
+def toggle_workspace(backend=None, index=None, ring=None, step=1):
+    """
+    Move along the workspace ring (0 <-> 1 by default) like toggle_workspace.sh.
+    With a live index the current desktop is read from its cache, no round trip.
+    Returns the target desktop.
+    """
+    backend = backend or get_backend()
+    ring = ring or DEFAULT_WORKSPACE_RING
+    if index is not None and index.live and index.current_desktop is not None:
+        current = index.current_desktop
+        # Skip ring entries for desktops that were removed meanwhile
+        ring = [num for num in ring if num < len(index.desktop_names)] or ring
+    else:
+        current = backend.current_desktop() or 0
+    target = next_in_ring(current, ring, step)
+    if target != current:
+        backend.switch_desktop(target)
+    return target
+
+
+def class_list_for_desktop(config, desktop=None):
+    """Initiative order for desktop: its own list (config: class_ini_by_desktop) or class_ini"""
+    by_desktop = config.get('class_ini_by_desktop') or {}
+    if desktop is not None and by_desktop.get(str(desktop)):
+        return list(by_desktop[str(desktop)])
+    return list(config.get('class_ini') or DEFAULT_CLASS_INI)
@@ -0,0 +1,256 @@
+"""
+Zero-copy window capture for the thumbnail overlay.
+
+XComposite keeps each window's contents in an offscreen pixmap (even when it
+is covered) and MIT-SHM has the X server write that pixmap straight into a
+shared memory segment: no pixels go through the X socket and no screenshot
+tool is spawned. libX11, libXext and libXcomposite are used through ctypes,
+so no extra Python package is needed.
+"""
+
+import ctypes
+from collections import namedtuple
+
+ZPixmap = 2
+IsViewable = 2
+CompositeRedirectAutomatic = 0
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+ALL_PLANES = ctypes.c_ulong(-1).value
+SHM_FAILED = ctypes.c_void_p(-1).value
+
+# Pixels of one captured window, valid until its next grab:
+# address points into the shared memory segment, stride is bytes per line
+Frame = namedtuple('Frame', 'address width height stride depth bits_per_pixel')
+
+
+class CaptureUnavailable(Exception):
+    """The libraries or X extensions needed for shared-memory capture are missing"""
+
+
+class XImage(ctypes.Structure):
+    # Leading fields only: the struct is always allocated by Xlib
+    _fields_ = [
+        ('width', ctypes.c_int), ('height', ctypes.c_int), ('xoffset', ctypes.c_int),
+        ('format', ctypes.c_int), ('data', ctypes.c_void_p), ('byte_order', ctypes.c_int),
+        ('bitmap_unit', ctypes.c_int), ('bitmap_bit_order', ctypes.c_int),
+        ('bitmap_pad', ctypes.c_int), ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int), ('bits_per_pixel', ctypes.c_int),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ('shmseg', ctypes.c_ulong), ('shmid', ctypes.c_int),
+        ('shmaddr', ctypes.c_void_p), ('readOnly', ctypes.c_int),
+    ]
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ('x', ctypes.c_int), ('y', ctypes.c_int), ('width', ctypes.c_int), ('height', ctypes.c_int),
+        ('border_width', ctypes.c_int), ('depth', ctypes.c_int), ('visual', ctypes.c_void_p),
+        ('root', ctypes.c_ulong), ('class_', ctypes.c_int), ('bit_gravity', ctypes.c_int),
+        ('win_gravity', ctypes.c_int), ('backing_store', ctypes.c_int),
+        ('backing_planes', ctypes.c_ulong), ('backing_pixel', ctypes.c_ulong),
+        ('save_under', ctypes.c_int), ('colormap', ctypes.c_ulong), ('map_installed', ctypes.c_int),
+        ('map_state', ctypes.c_int), ('all_event_masks', ctypes.c_long),
+        ('your_event_mask', ctypes.c_long), ('do_not_propagate_mask', ctypes.c_long),
+        ('override_redirect', ctypes.c_int), ('screen', ctypes.c_void_p),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int), ('display', ctypes.c_void_p), ('resourceid', ctypes.c_ulong),
+        ('serial', ctypes.c_ulong), ('error_code', ctypes.c_ubyte),
+        ('request_code', ctypes.c_ubyte), ('minor_code', ctypes.c_ubyte),
+    ]
+
+
+ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+_libs = None
+# Xlib's default handler exits the process: a vanished window must only fail its grab
+_errors = []
+
+
+@ERROR_HANDLER
+def _on_x_error(display, event):
+    _errors.append(event.contents.error_code)
+    return 0
+
+
+def _declare(lib, name, restype, *argtypes):
+    func = getattr(lib, name)
+    func.restype = restype
+    func.argtypes = argtypes
+
+
+def _libraries():
+    """(libX11, libXext, libXcomposite, libc) with their prototypes, loaded once"""
+    global _libs
+    if _libs is not None:
+        return _libs
+    try:
+        # Sonames directly: ctypes.util.find_library would spawn ldconfig
+        x11, xext, xcomposite, libc = (ctypes.CDLL(name) for name in (
+            'libX11.so.6', 'libXext.so.6', 'libXcomposite.so.1', 'libc.so.6'))
+    except OSError as e:
+        raise CaptureUnavailable(str(e))
+    dpy, xid, c_int, c_uint = ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_uint
+    shm_info = ctypes.POINTER(XShmSegmentInfo)
+    _declare(x11, 'XOpenDisplay', dpy, ctypes.c_char_p)
+    _declare(x11, 'XCloseDisplay', c_int, dpy)
+    _declare(x11, 'XSync', c_int, dpy, c_int)
+    _declare(x11, 'XFree', c_int, ctypes.c_void_p)
+    _declare(x11, 'XFreePixmap', c_int, dpy, xid)
+    _declare(x11, 'XSetErrorHandler', ctypes.c_void_p, ERROR_HANDLER)
+    _declare(x11, 'XGetWindowAttributes', c_int, dpy, xid, ctypes.POINTER(XWindowAttributes))
+    _declare(xext, 'XShmQueryExtension', c_int, dpy)
+    _declare(xext, 'XShmCreateImage', ctypes.POINTER(XImage),
+             dpy, ctypes.c_void_p, c_uint, c_int, ctypes.c_void_p, shm_info, c_uint, c_uint)
+    _declare(xext, 'XShmAttach', c_int, dpy, shm_info)
+    _declare(xext, 'XShmDetach', c_int, dpy, shm_info)
+    _declare(xext, 'XShmGetImage', c_int, dpy, xid, ctypes.POINTER(XImage), c_int, c_int, ctypes.c_ulong)
+    _declare(xcomposite, 'XCompositeQueryExtension', c_int,
+             dpy, ctypes.POINTER(c_int), ctypes.POINTER(c_int))
+    _declare(xcomposite, 'XCompositeRedirectWindow', None, dpy, xid, c_int)
+    _declare(xcomposite, 'XCompositeUnredirectWindow', None, dpy, xid, c_int)
+    _declare(xcomposite, 'XCompositeNameWindowPixmap', xid, dpy, xid)
+    _declare(libc, 'shmget', c_int, c_int, ctypes.c_size_t, c_int)
+    _declare(libc, 'shmat', ctypes.c_void_p, c_int, ctypes.c_void_p, c_int)
+    _declare(libc, 'shmdt', c_int, ctypes.c_void_p)
+    _declare(libc, 'shmctl', c_int, c_int, c_int, ctypes.c_void_p)
+    _libs = x11, xext, xcomposite, libc
+    return _libs
+
+
+class _Target:
+    """Redirected window: its named pixmap and the shared image it is read into"""
+
+    def __init__(self):
+        self.pixmap = 0
+        self.image = None
+        self.info = None
+        self.geometry = None
+
+
+class ShmCapture:
+    """
+    Capture client windows of one X display through its own connection.
+    Each window gets one shared image, reallocated only when its size or
+    depth changes. Not thread-safe: use it from a single thread.
+    """
+
+    def __init__(self, display_name=None):
+        self.x11, self.xext, self.xcomposite, self.libc = _libraries()
+        self.dpy = self.x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.dpy:
+            raise CaptureUnavailable(f"cannot open display {display_name or ''}".strip())
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not self.xext.XShmQueryExtension(self.dpy):
+            self.x11.XCloseDisplay(self.dpy)
+            raise CaptureUnavailable("X server without MIT-SHM")
+        if not self.xcomposite.XCompositeQueryExtension(self.dpy, ctypes.byref(event_base),
+                                                        ctypes.byref(error_base)):
+            self.x11.XCloseDisplay(self.dpy)
+            raise CaptureUnavailable("X server without Composite")
+        self.x11.XSetErrorHandler(_on_x_error)
+        self._targets = {}
+
+    def grab(self, wid):
+        """Frame of wid, or None when it is not viewable (minimized, other desktop) or gone"""
+        target = self._targets.get(wid)
+        if target is None:
+            # Automatic redirection: the server still draws the window on screen
+            self.xcomposite.XCompositeRedirectWindow(self.dpy, wid, CompositeRedirectAutomatic)
+            target = self._targets[wid] = _Target()
+        attrs = XWindowAttributes()
+        del _errors[:]
+        if not self.x11.XGetWindowAttributes(self.dpy, wid, ctypes.byref(attrs)) or _errors:
+            self.release(wid)
+            return None
+        if attrs.map_state != IsViewable:
+            # The pixmap is dropped by the server on unmap: name a new one on the next map
+            self._free_pixmap(target)
+            return None
+        geometry = (attrs.width, attrs.height, attrs.depth)
+        if geometry != target.geometry:
+            self._free_pixmap(target)
+            if not self._allocate(target, attrs):
+                return None
+            target.geometry = geometry
+        if not target.pixmap:
+            target.pixmap = self.xcomposite.XCompositeNameWindowPixmap(self.dpy, wid)
+        if not self.xext.XShmGetImage(self.dpy, target.pixmap, target.image, 0, 0, ALL_PLANES) or _errors:
+            self._free_pixmap(target)
+            return None
+        image = target.image.contents
+        return Frame(image.data, image.width, image.height, image.bytes_per_line, image.depth,
+                     image.bits_per_pixel)
+
+    def release(self, wid):
+        """Forget wid: free its pixmap and shared image, undo the redirection"""
+        target = self._targets.pop(wid, None)
+        if target is None:
+            return
+        self._free_pixmap(target)
+        self._free_image(target)
+        self.xcomposite.XCompositeUnredirectWindow(self.dpy, wid, CompositeRedirectAutomatic)
+        # Errors here only mean the window is already gone
+        self.x11.XSync(self.dpy, 0)
+        del _errors[:]
+
+    def close(self):
+        for wid in list(self._targets):
+            self.release(wid)
+        self.x11.XCloseDisplay(self.dpy)
+        self.dpy = None
+
+    def _allocate(self, target, attrs):
+        self._free_image(target)
+        info = XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(self.dpy, attrs.visual, attrs.depth, ZPixmap, None,
+                                          ctypes.byref(info), attrs.width, attrs.height)
+        if not image:
+            return False
+        info.shmid = self.libc.shmget(IPC_PRIVATE, image.contents.bytes_per_line * attrs.height,
+                                      IPC_CREAT | 0o600)
+        address = self.libc.shmat(info.shmid, None, 0) if info.shmid >= 0 else SHM_FAILED
+        if address in (None, SHM_FAILED):
+            if info.shmid >= 0:
+                self.libc.shmctl(info.shmid, IPC_RMID, None)
+            self.x11.XFree(image)
+            return False
+        info.shmaddr = image.contents.data = address
+        info.readOnly = 0
+        attached = self.xext.XShmAttach(self.dpy, ctypes.byref(info))
+        self.x11.XSync(self.dpy, 0)
+        # Marked for removal once both sides are attached: freed even if we crash
+        self.libc.shmctl(info.shmid, IPC_RMID, None)
+        # XShmCreateImage keeps a pointer to info: it lives as long as the image
+        target.image, target.info = image, info
+        if not attached or _errors:
+            del _errors[:]
+            self._free_image(target)
+            return False
+        return True
+
+    def _free_pixmap(self, target):
+        if target.pixmap:
+            self.x11.XFreePixmap(self.dpy, target.pixmap)
+            target.pixmap = 0
+
+    def _free_image(self, target):
+        if target.image is None:
+            return
+        self.xext.XShmDetach(self.dpy, ctypes.byref(target.info))
+        self.x11.XSync(self.dpy, 0)
+        self.libc.shmdt(target.info.shmaddr)
+        # The pixels are ours (shared memory): only the XImage struct is Xlib's
+        target.image.contents.data = None
+        self.x11.XFree(target.image)
+        target.image = target.info = None
+        target.geometry = None
@@ -0,0 +1,129 @@
+"""
+On-screen initiative order with the focused account highlighted.
+
+Purely event-driven: the overlay is repainted when _NET_ACTIVE_WINDOW
+changes the focused account or when the order changes, never on a timer.
+Each entry is rendered once into a cached pixmap (normal and highlighted)
+and a repaint only blits the rows that changed, so the overlay uses no CPU
+at all while nothing happens.
+"""
+
+from PyQt6 import QtWidgets, QtCore, QtGui
+from PyQt6.QtCore import Qt
+
+from core.utils import dofus_class
+
+ROW_HEIGHT = 24
+ROW_WIDTH = 150
+PADDING = 4
+
+
+class InitiativeOverlay(QtWidgets.QWidget):
+    """
+    Initiative order of class_list, fed by a WindowIndex.
+    Dragging moves the overlay; it never takes the focus.
+    """
+    _index_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, index, class_list, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint |
+                            Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.index = index
+        self.class_list = []
+        self.focused = None
+        # (row, name, highlighted) -> QPixmap, rendered once
+        self._pixmaps = {}
+        self._drag = None
+
+        # Index callbacks run on its event thread: handled on the GUI thread
+        self._index_changed.connect(self._on_index_changed)
+        self._listener = lambda kind, wid: self._index_changed.emit(kind)
+        index.add_listener(self._listener)
+        if not index.live:
+            index.refresh()
+        self.set_order(class_list)
+
+    def set_order(self, class_list):
+        class_list = list(class_list)
+        if class_list == self.class_list:
+            return
+        self.class_list = class_list
+        self._pixmaps.clear()
+        self.focused = self._focused_class()
+        self.setFixedSize(ROW_WIDTH + 2 * PADDING, max(len(class_list), 1) * ROW_HEIGHT + 2 * PADDING)
+        self.update()
+
+    def detach(self):
+        """Stop listening to the index (the overlay is being closed)"""
+        self.index.remove_listener(self._listener)
+
+    def _focused_class(self):
+        win = self.index.get(self.index.active) if self.index.active else None
+        return dofus_class(win.title) if win else None
+
+    def _on_index_changed(self, kind):
+        # Only the focus matters; renames can change which class the active window is
+        if kind not in ('active', 'title', 'added', 'removed', 'refresh'):
+            return
+        focused = self._focused_class()
+        if focused == self.focused:
+            return
+        previous, self.focused = self.focused, focused
+        for name in (previous, focused):
+            if name in self.class_list:
+                self.update(self._row_rect(self.class_list.index(name)))
+
+    def _row_rect(self, row):
+        return QtCore.QRect(PADDING, PADDING + row * ROW_HEIGHT, ROW_WIDTH, ROW_HEIGHT)
+
+    def _pixmap(self, row, name, highlighted):
+        key = (row, name, highlighted)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self._pixmaps[key] = self._render(row, name, highlighted)
+        return pixmap
+
+    def _render(self, row, name, highlighted):
+        ratio = self.devicePixelRatioF()
+        pixmap = QtGui.QPixmap(int(ROW_WIDTH * ratio), int(ROW_HEIGHT * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        rect = QtCore.QRectF(1, 1, ROW_WIDTH - 2, ROW_HEIGHT - 2)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QtGui.QColor(245, 197, 66, 230) if highlighted else QtGui.QColor(20, 20, 24, 200))
+        painter.drawRoundedRect(rect, 5, 5)
+        font = QtGui.QFont(self.font().family(), 10)
+        font.setBold(highlighted)
+        painter.setFont(font)
+        painter.setPen(QtGui.QColor('#111' if highlighted else '#ddd'))
+        painter.drawText(rect.adjusted(8, 0, -4, 0), Qt.AlignmentFlag.AlignVCenter, f"{row + 1}. {name}")
+        painter.end()
+        return pixmap
+
+    # === QT EVENTS ===
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        for row, name in enumerate(self.class_list):
+            rect = self._row_rect(row)
+            if rect.intersects(event.rect()):
+                painter.drawPixmap(rect.topLeft(), self._pixmap(row, name, name == self.focused))
+
+    def closeEvent(self, event):
+        self.detach()
+        super().closeEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag = event.globalPosition().toPoint() - self.pos()
+
+    def mouseMoveEvent(self, event):
+        if self._drag is not None:
+            self.move(event.globalPosition().toPoint() - self._drag)
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
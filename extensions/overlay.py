@@ -0,0 +1,279 @@
+"""
+Always-on-top strip with a live thumbnail of every account, in initiative order.
+
+Frames come from extensions.capture (XComposite + MIT-SHM); without it, Qt's
+own window grab is used. Each frame is scaled once into a thumbnail image
+owned by its tile and reused for every refresh. The focused account is
+refreshed at focused_fps, the others at idle_fps and slower while their
+picture does not change; windows that are not viewable are paused.
+Nothing runs while the strip is hidden.
+"""
+
+import time
+import zlib
+
+from PyQt6 import QtWidgets, QtCore, QtGui, sip
+from PyQt6.QtCore import Qt
+
+from .capture import CaptureUnavailable, ShmCapture
+
+# config.json "thumbnails" keys
+DEFAULT_SETTINGS = {'width': 192, 'focused_fps': 10, 'idle_fps': 1}
+# Unchanged pictures back off up to this interval (seconds)
+MAX_IDLE_INTERVAL = 4.0
+# Not viewable: only checked again this often, or when the desktop changes
+PAUSED_INTERVAL = 5.0
+LABEL_HEIGHT = 18
+SPACING = 4
+
+_FORMATS = {24: QtGui.QImage.Format.Format_RGB32, 32: QtGui.QImage.Format.Format_ARGB32_Premultiplied}
+
+
+class _Tile:
+    """One account: its window, thumbnail buffer and refresh schedule"""
+
+    def __init__(self, name, wid):
+        self.name = name
+        self.wid = wid
+        self.rect = QtCore.QRect()
+        self.image = None
+        self.crc = None
+        self.interval = 0.0
+        self.due = 0.0
+        self.paused = False
+
+
+class ThumbnailOverlay(QtWidgets.QWidget):
+    """
+    Live thumbnails of the accounts in class_list, fed by a WindowIndex.
+    Clicking a thumbnail calls activate(wid); dragging moves the strip.
+    """
+    _index_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, index, class_list, activate=None, settings=None, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint |
+                            Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.index = index
+        self.class_list = list(class_list)
+        self.activate = activate or index.backend.activate
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.tiles = []
+        self.active = None
+        self._drag = None
+        # CPU spent capturing and scaling, for the tooltip
+        self._frames = 0
+        self._cpu = 0.0
+        self._since = time.monotonic()
+
+        try:
+            self.capture = ShmCapture(index.display_name)
+            self.method = 'shm'
+        except CaptureUnavailable:
+            self.capture = None
+            self.method = 'grab'
+
+        # One single-shot timer armed for the next tile due: no fixed tick
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._refresh_due)
+
+        # Index callbacks run on its event thread: handled on the GUI thread
+        self._index_changed.connect(self._on_index_changed)
+        self._listener = lambda kind, wid: self._index_changed.emit(kind)
+        index.add_listener(self._listener)
+        if not index.live:
+            index.refresh()
+        self.active = index.active
+        self._rebuild()
+
+    def set_order(self, class_list):
+        self.class_list = list(class_list)
+        self._rebuild()
+
+    def close_capture(self):
+        self.timer.stop()
+        self.index.remove_listener(self._listener)
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+
+    # === LAYOUT ===
+    def _rebuild(self):
+        windows = self.index.dofus_windows()
+        previous = {tile.name: tile for tile in self.tiles}
+        self.tiles = []
+        width = int(self.settings['width'])
+        height = width * 9 // 16
+        for name in self.class_list:
+            win = windows.get(name)
+            if win is None:
+                continue
+            tile = previous.pop(name, None)
+            if tile is None or tile.wid != win.wid:
+                if tile is not None and self.capture:
+                    self.capture.release(tile.wid)
+                tile = _Tile(name, win.wid)
+            x = SPACING + len(self.tiles) * (width + SPACING)
+            tile.rect = QtCore.QRect(x, SPACING, width, height)
+            if tile.image is None or tile.image.size() != tile.rect.size():
+                # Allocated once per size, every frame is drawn into it
+                tile.image = QtGui.QImage(tile.rect.size(), QtGui.QImage.Format.Format_RGB32)
+                tile.image.fill(Qt.GlobalColor.black)
+                tile.crc = None
+            tile.due = 0.0
+            self.tiles.append(tile)
+        if self.capture:
+            for tile in previous.values():
+                self.capture.release(tile.wid)
+        count = max(len(self.tiles), 1)
+        self.setFixedSize(SPACING + count * (width + SPACING), height + LABEL_HEIGHT + 2 * SPACING)
+        self.update()
+        self._schedule()
+
+    # === REFRESH ===
+    def _on_index_changed(self, kind):
+        if kind == 'active':
+            self.active = self.index.active
+            # The newly focused account switches to the fast rate right away
+            for tile in self.tiles:
+                tile.interval = 0.0
+                if tile.wid == self.active:
+                    tile.due = 0.0
+            self.update()
+            self._schedule()
+        elif kind in ('desktops', 'desktop'):
+            for tile in self.tiles:
+                tile.paused = False
+                tile.due = 0.0
+            self._schedule()
+        elif kind in ('added', 'removed', 'title', 'refresh'):
+            self._rebuild()
+
+    def _schedule(self):
+        if not self.tiles or not self.isVisible():
+            self.timer.stop()
+            return
+        delay = min(tile.due for tile in self.tiles) - time.monotonic()
+        self.timer.start(max(0, int(delay * 1000)))
+
+    def _refresh_due(self):
+        now = time.monotonic()
+        started = time.thread_time()
+        for tile in self.tiles:
+            if tile.due <= now:
+                self._refresh(tile, now)
+        self._cpu += time.thread_time() - started
+        self._schedule()
+
+    def _refresh(self, tile, now):
+        source = self._grab(tile.wid)
+        tile.paused = source is None
+        if tile.paused:
+            tile.due = now + PAUSED_INTERVAL
+            self.update(tile.rect)
+            return
+        painter = QtGui.QPainter(tile.image)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.SmoothPixmapTransform)
+        painter.fillRect(tile.image.rect(), Qt.GlobalColor.black)
+        size = source.size().scaled(tile.image.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        target = QtCore.QRect(QtCore.QPoint(), size)
+        target.moveCenter(tile.image.rect().center())
+        painter.drawImage(target, source)
+        painter.end()
+        self._frames += 1
+
+        bits = tile.image.constBits()
+        bits.setsize(tile.image.sizeInBytes())
+        crc = zlib.crc32(bits)
+        base = 1.0 / float(self.settings['focused_fps' if tile.wid == self.active else 'idle_fps'])
+        if crc == tile.crc:
+            # Static picture (loading screen, idle follower): back off
+            tile.interval = min(max(tile.interval, base) * 2, max(MAX_IDLE_INTERVAL, base))
+        else:
+            tile.interval = base
+            tile.crc = crc
+            self.update(tile.rect)
+        tile.due = now + tile.interval
+
+    def _grab(self, wid):
+        """QImage of wid (a view on shared memory when possible), None when not viewable"""
+        if self.capture:
+            frame = self.capture.grab(wid)
+            if frame is None:
+                return None
+            image_format = _FORMATS.get(frame.depth) if frame.bits_per_pixel == 32 else None
+            if image_format is not None:
+                # No copy: the QImage only lives until the frame is scaled
+                return QtGui.QImage(sip.voidptr(frame.address), frame.width, frame.height,
+                                    frame.stride, image_format)
+        screen = self.screen() or QtGui.QGuiApplication.primaryScreen()
+        pixmap = screen.grabWindow(wid)
+        return None if pixmap.isNull() else pixmap.toImage()
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._since, 1e-3)
+        return (f"{self._frames / elapsed:.1f} frames/s, {self._cpu / elapsed * 100:.1f}% CPU "
+                f"({self.method})")
+
+    # === QT EVENTS ===
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor(20, 20, 24, 230))
+        painter.setFont(QtGui.QFont(self.font().family(), 9))
+        for tile in self.tiles:
+            if not tile.rect.intersects(event.rect()):
+                continue
+            painter.drawImage(tile.rect, tile.image)
+            if tile.paused:
+                painter.fillRect(tile.rect, QtGui.QColor(0, 0, 0, 150))
+            focused = tile.wid == self.active
+            painter.setPen(QtGui.QPen(QtGui.QColor('#f5c542' if focused else '#444'), 2 if focused else 1))
+            painter.drawRect(tile.rect.adjusted(0, 0, -1, -1))
+            label = QtCore.QRect(tile.rect.left(), tile.rect.bottom() + 2, tile.rect.width(), LABEL_HEIGHT)
+            painter.setPen(QtGui.QColor('#f5c542' if focused else '#ddd'))
+            painter.drawText(label, Qt.AlignmentFlag.AlignCenter, tile.name)
+        if not self.tiles:
+            painter.setPen(QtGui.QColor('#888'))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Aucune fenêtre Dofus")
+
+    def event(self, event):
+        if event.type() == QtCore.QEvent.Type.ToolTip:
+            # Computed only when Qt shows the tooltip
+            self.setToolTip(self.stats())
+        return super().event(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        for tile in self.tiles:
+            tile.due = 0.0
+        self._schedule()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def closeEvent(self, event):
+        self.close_capture()
+        super().closeEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag = (event.globalPosition().toPoint(), self.pos(), False)
+
+    def mouseMoveEvent(self, event):
+        if self._drag:
+            start, origin, _ = self._drag
+            offset = event.globalPosition().toPoint() - start
+            if offset.manhattanLength() > QtWidgets.QApplication.startDragDistance():
+                self._drag = (start, origin, True)
+                self.move(origin + offset)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag and not self._drag[2]:
+            for tile in self.tiles:
+                if tile.rect.contains(event.position().toPoint()):
+                    self.activate(tile.wid)
+                    break
+        self._drag = None
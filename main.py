@@ -2,21 +2,24 @@
 """
 Dofus Window Manager - Modern Edition
 Entry point for the application with premium dark theme.
+
+Run with --daemon to start the headless cycle daemon instead of the GUI;
+add --display :1 --display :2 to serve several X displays from one process.
 """
 
 import sys
 
-try:
-    from PyQt6 import QtWidgets, QtCore, QtGui
-except ImportError:
-    print("❌ PyQt6 required. Install with: pip install PyQt6")
-    sys.exit(1)
 
-from ui.main_window import ModernDofusManager
+def run_gui():
+    """Initialize and run the application"""
+    try:
+        from PyQt6 import QtWidgets, QtCore, QtGui
+    except ImportError:
+        print("❌ PyQt6 required. Install with: pip install PyQt6")
+        sys.exit(1)
 
+    from ui.main_window import ModernDofusManager
 
-def main():
-    """Initialize and run the application"""
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle('Fusion')
 
@@ -33,5 +36,24 @@ def main():
     sys.exit(app.exec())
 
 
+def requested_displays(argv):
+    """Values of every --display NAME / --display=NAME (comma lists allowed)"""
+    displays = []
+    for i, arg in enumerate(argv):
+        if arg == '--display' and i + 1 < len(argv):
+            displays += argv[i + 1].split(',')
+        elif arg.startswith('--display='):
+            displays += arg.split('=', 1)[1].split(',')
+    return [name for name in displays if name]
+
+
+def main():
+    if '--daemon' in sys.argv[1:]:
+        # Headless: never import PyQt6 for the resident cycle daemon
+        from core.daemon import run_daemon
+        sys.exit(run_daemon(requested_displays(sys.argv[1:]) or None))
+    run_gui()
+
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# core.config creates its directories on import: keep them out of $HOME
+_SANDBOX = Path(tempfile.mkdtemp(prefix="dofus_tests_"))
+os.environ.setdefault("DOFUS_WM_CONFIG_DIR", str(_SANDBOX / "config"))
+os.environ.setdefault("DOFUS_WM_STATE_FILE", str(_SANDBOX / "window_index"))
+os.environ["XDG_RUNTIME_DIR"] = str(_SANDBOX)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
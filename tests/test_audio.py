@@ -0,0 +1,70 @@
+import stat
+
+from core.audio import AudioMuter, parse_sink_inputs
+
+SINK_INPUTS = """Sink Input #11
+\tDriver: protocol-native.c
+\tMute: no
+\tProperties:
+\t\tapplication.name = "Dofus"
+\t\tapplication.process.id = "100"
+Sink Input #12
+\tMute: yes
+\tProperties:
+\t\tapplication.process.id = "200"
+Sink Input #13
+\tMute: no
+\tProperties:
+\t\tapplication.process.id = "200"
+Sink Input #14
+\tMute: no
+\tProperties:
+\t\tapplication.name = "no pid"
+"""
+
+
+def fake_pactl(tmp_path):
+    """pactl stub: prints SINK_INPUTS and logs every call"""
+    (tmp_path / "sink-inputs").write_text(SINK_INPUTS)
+    script = tmp_path / "pactl"
+    script.write_text(f"""#!/bin/bash
+echo "$*" >> "{tmp_path}/calls"
+[[ "$1" == list ]] && cat "{tmp_path}/sink-inputs"
+exit 0
+""")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script
+
+
+def calls(tmp_path):
+    return (tmp_path / "calls").read_text().splitlines()
+
+
+def test_parse_sink_inputs():
+    inputs = parse_sink_inputs(SINK_INPUTS)
+    assert [(i.id, i.pid, i.muted) for i in inputs] == [
+        (11, 100, False), (12, 200, True), (13, 200, False), (14, None, False)]
+
+
+def test_snapshot_groups_inputs_by_pid(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOFUS_PACTL", str(fake_pactl(tmp_path)))
+    by_pid = AudioMuter().snapshot()
+    assert sorted(by_pid) == [100, 200]
+    assert [entry.id for entry in by_pid[200]] == [12, 13]
+
+
+def test_apply_uses_one_snapshot_and_skips_inputs_already_set(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOFUS_PACTL", str(fake_pactl(tmp_path)))
+    changes = AudioMuter(jobs=2).apply(mute_pids={200}, unmute_pids={100})
+    # 12 is already muted and 11 already audible: only 13 changes
+    assert changes == [(13, 200, True)]
+    assert calls(tmp_path) == ["list sink-inputs", "set-sink-input-mute 13 1"]
+
+
+def test_apply_batches_every_change(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOFUS_PACTL", str(fake_pactl(tmp_path)))
+    changes = AudioMuter(jobs=4).apply(mute_pids={100, 200})
+    assert sorted(changes) == [(11, 100, True), (13, 200, True)]
+    log = calls(tmp_path)
+    assert log[0] == "list sink-inputs"
+    assert sorted(log[1:]) == ["set-sink-input-mute 11 1", "set-sink-input-mute 13 1"]
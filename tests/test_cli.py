@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Same budget as benchmarks/bench_cli.py (ms spent importing core.*)
+IMPORT_BUDGET_MS = 60.0
+
+
+def test_cli_help_stays_headless_and_under_budget():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'core', '--help'],
+                            cwd=ROOT, env=dict(os.environ), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    modules = []
+    core_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        modules.append(name.strip())
+        # Top-level entries only: nested imports are part of their parent's time
+        if name.startswith(' core'):
+            core_us += int(cumulative)
+    assert 'core' in modules
+    assert not [name for name in modules if name.startswith('PyQt6')]
+    assert core_us / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,29 @@
+from core.cycle import CycleRing
+from core.daemon import parse_presses
+
+
+def test_peek_skips_missing_accounts_and_coalesces_presses(tmp_path):
+    ring = CycleRing(['Cra', 'Enu', 'Iop', 'Sadi'], tmp_path / "state")
+    available = {'Cra', 'Iop', 'Sadi'}
+    assert ring.peek(available) == (2, 'Iop')
+    assert ring.peek(available, step=2) == (3, 'Sadi')
+    # A burst wraps around the accounts that are present
+    assert ring.peek(available, step=4) == (2, 'Iop')
+    assert ring.peek(available, step=-1) == (3, 'Sadi')
+    assert ring.peek(set()) is None
+    assert ring.peek(available, step=0) is None
+
+
+def test_peek_does_not_move_until_commit(tmp_path):
+    ring = CycleRing(['Cra', 'Enu'], tmp_path / "state")
+    ring.peek({'Cra', 'Enu'})
+    assert ring.index == 0
+    ring.commit(1)
+    assert CycleRing(['Cra', 'Enu'], tmp_path / "state").index == 1
+
+
+def test_parse_presses_nets_steps_per_team():
+    steps, workspace = parse_presses(b"next\nnext\nprev\nnext:pvp\nworkspace\nbogus\n")
+    assert steps == {None: 1, 'pvp': 1}
+    assert workspace == 1
+    assert parse_presses(b"") == ({}, 0)
@@ -0,0 +1,57 @@
+from core.backend import Window
+from core.reorganize import longest_increasing_subsequence, plan_moves
+from core.window_index import WindowIndex
+
+
+def test_longest_increasing_subsequence():
+    values = [3, 1, 2, 5, 4, 6]
+    kept = [values[i] for i in longest_increasing_subsequence(values)]
+    assert len(kept) == 4 and kept == sorted(kept)
+    assert longest_increasing_subsequence([]) == []
+
+
+def test_plan_moves_bounce_keeps_only_an_ordered_prefix():
+    assert plan_moves([1, 2, 3], [1, 2, 3], append_only=True) == []
+    # Moved windows go to the end: 1 stays first once 2 and 3 are sent after it
+    assert plan_moves([2, 3, 1], [1, 2, 3], append_only=True) == [2, 3]
+    assert plan_moves([1, 3, 2], [1, 2, 3], append_only=True) == [3]
+    assert plan_moves([3, 2, 1], [1, 2, 3], append_only=True) == [2, 3]
+    # Windows the current order does not know about always move
+    assert plan_moves([1, 2], [1, 2, 3], append_only=True) == [3]
+
+
+def test_plan_moves_restack_keeps_a_longest_ordered_run():
+    assert plan_moves([2, 3, 1], [1, 2, 3], append_only=False) == [1]
+    assert plan_moves([1, 2, 3], [1, 2, 3], append_only=False) == []
+
+
+class FakeBackend:
+    """Client list in mapping order, like _NET_CLIENT_LIST"""
+
+    def __init__(self, windows):
+        self.windows = windows
+
+    def list_windows(self):
+        return list(self.windows)
+
+    def active_window(self):
+        return None
+
+    def desktop_layout(self):
+        return ['1', '2'], 0
+
+
+def test_cold_index_starts_from_the_saved_taskbar_order(tmp_path):
+    windows = [Window(wid, 0, wid, f"Dofus-{wid}") for wid in (1, 2, 3)]
+    index = WindowIndex(FakeBackend(windows))
+    index.taskbar_file = tmp_path / "taskbar"
+    index.refresh()
+    index.record_arrivals(0, [1, 2])
+    index.save_taskbar()
+    assert index.taskbar_order(0) == [3, 1, 2]
+
+    # Next run: 2 is gone and 4 is new, the client list order is unchanged
+    cold = WindowIndex(FakeBackend([windows[0], windows[2], Window(4, 0, 4, "Dofus-4")]))
+    cold.taskbar_file = index.taskbar_file
+    cold.refresh()
+    assert cold.taskbar_order(0) == [3, 1, 4]
@@ -8,23 +8,41 @@ from PyQt6 import QtWidgets, QtCore, QtGui
 from PyQt6.QtCore import Qt, QTimer
 
 from core.config import (
-    APP_NAME, CONFIG_FILE, PROFILES_FILE, DEFAULT_CLASS_INI,
+    APP_NAME, CONFIG_FILE, DEFAULT_CLASS_INI,
     RENAME_SCRIPT, REORGANIZE_SCRIPT, CLICK_CYCLE_FORWARD, CYCLE_FORWARD, CYCLE_BACKWARD, 
-    TOGGLE_WORKSPACE, SPACE_CYCLE_FORWARD, SCRIPT_DIR
+    TOGGLE_WORKSPACE, SPACE_CYCLE_FORWARD, SCRIPT_DIR, CLASS_FILE
 )
-from core.config import load_json, save_json
+from core.config import load_json
+from core.persist import WriteBehind
+from core.profiles import ProfileStore
 from core.scripts import (
     generate_rename_script, generate_reorganize_script, generate_cycle_forward, 
     generate_cycle_backward, generate_toggle_workspace, generate_space_cycle_forward,
-    generate_click_cycle
+    generate_click_cycle, generate_all_scripts, generate_class_file, generate_team_scripts,
+    rename_script_workspace
 )
-from core.workspace import get_workspaces
-from core.utils import run_cmd
-from ui.widgets import CompactDraggableList
+from core.daemon import send_command
+from core.window_index import WindowIndex
+from core.actions import rename_windows, follower_filter
+from core.activation import configured_method, probe, record_probe
+from core.daemon import CycleDaemon
+from core.hotkeys import DEFAULT_HOTKEYS, HotkeyGrabber
+from core.workspace import class_list_for_desktop, toggle_workspace
+from core.audio import AudioMuter
+from core.executor import configured_jobs
+from core.teams import load_teams, team_hotkeys
+from core.reorganize import reorganize_windows
+from ui.widgets import CompactDraggableList, InitiativeModel
+from ui.tasks import TaskRunner
+
+# The picker lists at most this many names; the filter narrows it down
+PROFILE_PICKER_LIMIT = 200
 
 
 class ModernDofusManager(QtWidgets.QMainWindow):
     """Clean and modern Dofus Window Manager"""
+    _write_failed = QtCore.pyqtSignal(str, str)
+    _hotkey_pressed = QtCore.pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
@@ -38,14 +56,64 @@ class ModernDofusManager(QtWidgets.QMainWindow):
         )
 
         # Load config
-        cfg = load_json(CONFIG_FILE, {})
-        self.class_ini = cfg.get('class_ini', DEFAULT_CLASS_INI.copy())
-        self.profiles = load_json(PROFILES_FILE, {})
+        self.config = load_json(CONFIG_FILE, {})
+        # Initiative order: the list model is the single source of truth
+        self.initiative = InitiativeModel(self.config.get('class_ini', DEFAULT_CLASS_INI.copy()), self)
+        self.initiative.orderChanged.connect(self._sync_from_list)
+        # Imports profiles.json on first run (and whenever it is edited by hand)
+        self.profiles = ProfileStore()
+
+        # Config and profile changes are coalesced and written off the GUI thread
+        self._write_failed.connect(self._on_write_failed)
+        self.store = WriteBehind(on_error=lambda path, error: self._write_failed.emit(path.name, error))
+
+        # Live view of the Dofus clients, updated from X events
+        self.window_index = WindowIndex().start()
+        self.muter = AudioMuter(jobs=configured_jobs(self.config))
+        if self.config.get('auto_mute'):
+            self.muter.watch(follower_filter(self.window_index, self._class_list_for))
+
+        # Blocking actions run in the background and report through signals
+        self.tasks = TaskRunner(self)
+        self.tasks.progress.connect(self._on_task_progress)
+        self.tasks.finished.connect(self._on_task_finished)
+        self.tasks.failed.connect(self._on_task_failed)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.tasks.shutdown)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.store.flush)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.profiles.close)
+
+        # Global hotkeys grabbed by the manager itself: no shell on the key path
+        self.cycler = CycleDaemon(index=self.window_index)
+        self.cycler.reload(self.class_ini)
+        self.cycler.activate.method = configured_method(self.config)
+        self.hotkeys = None
+        self._hotkey_pressed.connect(self._on_hotkey_action)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._stop_hotkeys)
+
+        # Live thumbnail strip and initiative overlay (extensions/), created on first use
+        self.thumbnails = None
+        self.initiative_overlay = None
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._close_thumbnails)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._close_initiative_overlay)
 
         self._setup_ui()
         self._apply_theme()
         self._create_tray()
         self._refresh_all()
+        if self.config.get('grab_hotkeys'):
+            self._start_hotkeys()
+        if self.config.get('show_thumbnails'):
+            self._show_thumbnails()
+        if self.config.get('show_initiative'):
+            self._show_initiative_overlay()
+
+    @property
+    def class_ini(self):
+        return self.initiative.classes
+
+    @class_ini.setter
+    def class_ini(self, classes):
+        self.initiative.set_classes(classes)
 
     def _setup_ui(self):
         """Build clean interface"""
@@ -75,11 +143,11 @@ class ModernDofusManager(QtWidgets.QMainWindow):
         btn_rename.setStyleSheet(self._get_btn_style("#0d7377"))
         quick_layout.addWidget(btn_rename)
 
-        btn_reorder = QtWidgets.QPushButton("🔄 Réorganiser Fenêtres")
-        btn_reorder.setFixedHeight(40)
-        btn_reorder.clicked.connect(self._quick_reorganize)
-        btn_reorder.setStyleSheet(self._get_btn_style("#8b5cf6"))
-        quick_layout.addWidget(btn_reorder)
+        self.btn_reorder = QtWidgets.QPushButton("🔄 Réorganiser Fenêtres")
+        self.btn_reorder.setFixedHeight(40)
+        self.btn_reorder.clicked.connect(self._on_reorder_clicked)
+        self.btn_reorder.setStyleSheet(self._get_btn_style("#8b5cf6"))
+        quick_layout.addWidget(self.btn_reorder)
 
         btn_menu = QtWidgets.QPushButton("⚙️")
         btn_menu.setFixedSize(40, 40)
@@ -128,8 +196,7 @@ class ModernDofusManager(QtWidgets.QMainWindow):
         layout.setSpacing(8)
 
         # List
-        self.list_widget = CompactDraggableList()
-        self.list_widget.orderChanged.connect(self._sync_from_list)
+        self.list_widget = CompactDraggableList(self.initiative)
         self.list_widget.setMinimumHeight(240)
         layout.addWidget(self.list_widget)
 
@@ -169,13 +236,22 @@ class ModernDofusManager(QtWidgets.QMainWindow):
         layout = QtWidgets.QVBoxLayout(group)
         layout.setSpacing(8)
 
+        # Filter: prefix then fuzzy match on the profile names
+        self.profile_filter = QtWidgets.QLineEdit()
+        self.profile_filter.setPlaceholderText("🔍 Filtrer les profils...")
+        self.profile_filter.setFixedHeight(28)
+        self.profile_filter.setClearButtonEnabled(True)
+        self.profile_filter.textChanged.connect(lambda _: self._refresh_profiles())
+        layout.addWidget(self.profile_filter)
+
         # Selector
         selector_layout = QtWidgets.QHBoxLayout()
         selector_layout.setSpacing(6)
 
         self.combo_profiles = QtWidgets.QComboBox()
         self.combo_profiles.setFixedHeight(32)
-        self.combo_profiles.currentTextChanged.connect(self._on_profile_selected)
+        self.combo_profiles.activated.connect(
+            lambda index: self._on_profile_selected(self.combo_profiles.itemText(index)))
         selector_layout.addWidget(self.combo_profiles)
 
         # Buttons
@@ -445,12 +521,153 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         menu.addAction("Rename").triggered.connect(self._quick_rename)
         menu.addAction("Reorder").triggered.connect(self._quick_reorganize)
         menu.addSeparator()
+        self.action_hotkeys = menu.addAction("Raccourcis intégrés")
+        self.action_hotkeys.setCheckable(True)
+        self.action_hotkeys.setChecked(bool(self.config.get('grab_hotkeys')))
+        self.action_hotkeys.toggled.connect(self._toggle_hotkeys)
+        menu.addAction("Mesurer l'activation").triggered.connect(self._probe_activation)
+        self.action_thumbnails = menu.addAction("Miniatures des comptes")
+        self.action_thumbnails.setCheckable(True)
+        self.action_thumbnails.setChecked(bool(self.config.get('show_thumbnails')))
+        self.action_thumbnails.toggled.connect(self._toggle_thumbnails)
+        self.action_initiative = menu.addAction("Ordre d'initiative à l'écran")
+        self.action_initiative.setCheckable(True)
+        self.action_initiative.setChecked(bool(self.config.get('show_initiative')))
+        self.action_initiative.toggled.connect(self._toggle_initiative_overlay)
+        menu.addSeparator()
         menu.addAction("Quit").triggered.connect(QtWidgets.QApplication.quit)
 
         self.tray.setContextMenu(menu)
         self.tray.activated.connect(self._on_tray_click)
         self.tray.show()
 
+    # === HOTKEYS ===
+    def _toggle_hotkeys(self, enabled):
+        self.config['grab_hotkeys'] = enabled
+        self.config.setdefault('hotkeys', dict(DEFAULT_HOTKEYS))
+        self._save_config()
+        if enabled:
+            self._start_hotkeys()
+        else:
+            self._stop_hotkeys()
+            self._show_status("⌨️ Hotkeys released (scripts only)")
+
+    def _start_hotkeys(self):
+        self._stop_hotkeys()
+        bindings = dict(self.config.get('hotkeys') or DEFAULT_HOTKEYS)
+        bindings.update(team_hotkeys(load_teams(self.config)))
+        self.hotkeys = HotkeyGrabber(bindings, self._on_hotkey).start()
+        if not self.hotkeys.grabbed and not self.hotkeys.failed:
+            self._show_status("⚠️ Hotkeys need python-xlib", 5000)
+        elif self.hotkeys.failed:
+            # Keys already bound in the desktop settings keep running the scripts
+            failed = ', '.join(f"{action} ({reason})" for action, reason in self.hotkeys.failed.items())
+            self.status_label.setToolTip(failed)
+            self._show_status(f"⌨️ {len(self.hotkeys.grabbed)} hotkeys, "
+                              f"{len(self.hotkeys.failed)} left to scripts", 5000)
+        else:
+            self._show_status(f"⌨️ {len(self.hotkeys.grabbed)} hotkeys active")
+
+    def _stop_hotkeys(self):
+        if self.hotkeys:
+            self.hotkeys.stop()
+            self.hotkeys = None
+
+    def _on_hotkey(self, action, count=1):
+        """Runs on the grabber thread: cycling is handled right there, repeats as one jump"""
+        # Team bindings are 'cycle_next:<team>'
+        action, _, team = action.partition(':')
+        if action == 'cycle_next':
+            self.cycler.cycle(count, team or None)
+        elif action == 'cycle_prev':
+            self.cycler.cycle(-count, team or None)
+        else:
+            self._hotkey_pressed.emit(action)
+
+    def _on_hotkey_action(self, action):
+        if action == 'rename':
+            self._quick_rename()
+        elif action == 'reorganize':
+            self._quick_reorganize()
+        elif action == 'toggle_workspace':
+            # The live index caches the current desktop: no round trip
+            toggle_workspace(index=self.window_index, ring=self.config.get('workspace_ring'))
+
+    # === OVERLAYS ===
+    def _toggle_thumbnails(self, enabled):
+        self.config['show_thumbnails'] = enabled
+        self._save_config()
+        if enabled:
+            self._show_thumbnails()
+        else:
+            self._close_thumbnails()
+
+    def _show_thumbnails(self):
+        # Imported on demand: the strip and its capture code cost nothing when unused
+        from extensions.overlay import ThumbnailOverlay
+        if self.thumbnails is None:
+            self.thumbnails = ThumbnailOverlay(self.window_index, self.class_ini, activate=self.cycler.activate,
+                                               settings=self.config.get('thumbnails'))
+        self.thumbnails.show()
+        self._show_status(f"🖼 Thumbnails: {self.thumbnails.method} capture")
+
+    def _close_thumbnails(self):
+        if self.thumbnails is not None:
+            self.thumbnails.close()
+            self.thumbnails = None
+
+    def _toggle_initiative_overlay(self, enabled):
+        self.config['show_initiative'] = enabled
+        self._save_config()
+        if enabled:
+            self._show_initiative_overlay()
+        else:
+            self._close_initiative_overlay()
+
+    def _show_initiative_overlay(self):
+        from extensions.initiative import InitiativeOverlay
+        if self.initiative_overlay is None:
+            self.initiative_overlay = InitiativeOverlay(self.window_index, self.class_ini)
+        self.initiative_overlay.show()
+
+    def _close_initiative_overlay(self):
+        if self.initiative_overlay is not None:
+            self.initiative_overlay.close()
+            self.initiative_overlay = None
+
+    def _sync_overlays(self):
+        if self.thumbnails is not None:
+            self.thumbnails.set_order(self.class_ini)
+        if self.initiative_overlay is not None:
+            self.initiative_overlay.set_order(self.class_ini)
+
+    # === ACTIVATION ===
+    def _probe_activation(self):
+        if not self.window_index.live:
+            self.window_index.refresh()
+        wids = [win.wid for win in self.window_index.dofus_windows().values()]
+        if len(wids) < 2:
+            self._show_status("⚠️ Open at least two Dofus windows", 4000)
+            return
+        self.status_label.setText("⏱ Measuring activation...")
+        self.tasks.submit('activation', lambda task: probe(wids, index=self.window_index))
+
+    def _on_activation_probed(self, result):
+        best, results = result
+        record_probe(self.config, best, results)
+        self.cycler.activate.method = configured_method(self.config)
+        self._save_config()
+        if CYCLE_FORWARD.exists():
+            # config.json is written behind: hand the new method over directly
+            self._generate_cycle_scripts()
+        self.status_label.setToolTip('\n'.join(
+            f"{name}: {r['median_ms']} ms, {r['confirmed']}/{r['tries']} confirmed"
+            for name, r in results.items()))
+        if best:
+            self._show_status(f"✅ Activation: {best} ({results[best]['median_ms']:.0f} ms)", 4000)
+        else:
+            self._show_status("⚠️ No strategy confirmed focus every time", 4000)
+
     def _on_tray_click(self, reason):
         if reason == QtWidgets.QSystemTrayIcon.ActivationReason.Trigger:
             self.showNormal() if self.isHidden() else self.hide()
@@ -460,34 +677,39 @@ Gérez et organisez efficacement vos fenêtres Dofus.
 
     # === DATA MANAGEMENT ===
     def _refresh_all(self):
-        self._refresh_list()
         self._refresh_profiles()
 
-    def _refresh_list(self):
-        self.list_widget.clear()
-        for i, name in enumerate(self.class_ini, 1):
-            item = QtWidgets.QListWidgetItem(f"{i}. {name}")
-            item.setData(Qt.ItemDataRole.UserRole, name)
-            self.list_widget.addItem(item)
-
-    def _refresh_profiles(self):
-        current = self.combo_profiles.currentText()
+    def _refresh_profiles(self, select=None):
+        current = select or self.combo_profiles.currentText()
+        names = self.profiles.search(self.profile_filter.text(), limit=PROFILE_PICKER_LIMIT)
+        # Only names are listed: a profile's classes are read when it is picked
         self.combo_profiles.clear()
-        self.combo_profiles.addItems(sorted(self.profiles.keys()))
-        if current in self.profiles:
+        self.combo_profiles.addItems(names)
+        if current in names:
             self.combo_profiles.setCurrentText(current)
 
     def _sync_from_list(self):
-        self.class_ini = [
-            self.list_widget.item(i).data(Qt.ItemDataRole.UserRole)
-            for i in range(self.list_widget.count())
-        ]
-        self._refresh_list()
         self._save_config()
         self._show_status("✅ Order updated")
 
     def _save_config(self):
-        save_json(CONFIG_FILE, {'class_ini': self.class_ini})
+        self.config['class_ini'] = self.class_ini
+        self.cycler.reload(self.class_ini)
+        self._sync_overlays()
+        # Let a running cycle daemon pick up the new order once the file is on disk
+        self.store.save(CONFIG_FILE, self.config, after=lambda: send_command('reload', timeout=0.2))
+        # Scripts already on disk source classes.sh: refreshing it keeps the hotkeys in sync
+        if CLASS_FILE.exists():
+            generate_class_file(self.class_ini, self.config.get('class_ini_by_desktop') or {})
+
+    def _class_list_for(self, desktop):
+        """Initiative order used on a desktop: its own saved order or the current one"""
+        return class_list_for_desktop({'class_ini': self.class_ini,
+                                       'class_ini_by_desktop': self.config.get('class_ini_by_desktop')},
+                                      desktop)
+
+    def _on_write_failed(self, name, error):
+        self._show_status(f"❌ Save failed: {name} ({error})", 5000)
 
     def _show_status(self, message, duration=2000):
         self.status_label.setText(message)
@@ -509,8 +731,7 @@ Gérez et organisez efficacement vos fenêtres Dofus.
     def _add_class(self):
         text, ok = QtWidgets.QInputDialog.getText(self, "Add Class", "Class name:")
         if ok and text.strip():
-            self.class_ini.append(text.strip())
-            self._refresh_list()
+            self.initiative.append(text.strip())
             self._save_config()
             self._show_status(f"✅ Added: {text.strip()}")
 
@@ -522,8 +743,7 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         old = self.class_ini[idx]
         text, ok = QtWidgets.QInputDialog.getText(self, "Rename", "New name:", text=old)
         if ok and text.strip():
-            self.class_ini[idx] = text.strip()
-            self._refresh_list()
+            self.initiative.rename(idx, text.strip())
             self._save_config()
             self._show_status(f"✅ Renamed: {text.strip()}")
 
@@ -532,9 +752,7 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         if idx < 0:
             self._show_status("⚠️ Select a class")
             return
-        name = self.class_ini[idx]
-        del self.class_ini[idx]
-        self._refresh_list()
+        name = self.initiative.remove(idx)
         self._save_config()
         self._show_status(f"✅ Deleted: {name}")
 
@@ -545,7 +763,6 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         )
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
             self.class_ini = DEFAULT_CLASS_INI.copy()
-            self._refresh_list()
             self._save_config()
             self._show_status("✅ Reset to default")
 
@@ -553,17 +770,16 @@ Gérez et organisez efficacement vos fenêtres Dofus.
     def _save_profile(self):
         text, ok = QtWidgets.QInputDialog.getText(self, "Save Profile", "Profile name:")
         if ok and text.strip():
-            self.profiles[text.strip()] = list(self.class_ini)
-            save_json(PROFILES_FILE, self.profiles)
-            self._refresh_profiles()
+            self.profiles.put(text.strip(), self.class_ini)
+            self._refresh_profiles(select=text.strip())
             self._show_status(f"✅ Profile saved: {text.strip()}")
 
     def _on_profile_selected(self, name):
         """Auto-load profile when selected"""
-        if not name or name not in self.profiles:
+        class_list = self.profiles.get(name) if name else None
+        if not class_list:
             return
-        self.class_ini = list(self.profiles[name])
-        self._refresh_list()
+        self.class_ini = class_list
         self._save_config()
         self._show_status(f"✅ Loaded: {name}")
 
@@ -576,15 +792,20 @@ Gérez et organisez efficacement vos fenêtres Dofus.
             QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
         )
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            del self.profiles[name]
-            save_json(PROFILES_FILE, self.profiles)
+            self.profiles.delete(name)
             self._refresh_profiles()
             self._show_status(f"✅ Deleted: {name}")
 
     # === SCRIPTS ===
+    def _generate_cycle_scripts(self):
+        """Cycle scripts from the in-memory config, which may not be on disk yet"""
+        method = configured_method(self.config)
+        generate_cycle_forward(self.class_ini, method)
+        generate_cycle_backward(self.class_ini, method)
+        generate_team_scripts(self.class_ini, load_teams(self.config), method)
+
     def _generate_cycle_only(self):
-        generate_cycle_forward(self.class_ini)
-        generate_cycle_backward(self.class_ini)
+        self._generate_cycle_scripts()
         self._show_status("✅ Cycle scripts generated")
 
     def _generate_click_cycle_only(self):
@@ -596,7 +817,7 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         self._show_status("✅ Workspace script generated")
 
     def _generate_rename_only(self):
-        generate_rename_script(self.class_ini)
+        generate_rename_script(self.class_ini, rename_script_workspace())
         self._show_status("✅ Rename script generated")
 
     def _generate_space_cycle_only(self):
@@ -604,33 +825,78 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         self._show_status("✅ Space+Cycle generated")
 
     def _generate_all_scripts(self):
-        generate_rename_script(self.class_ini)
-        generate_reorganize_script(self.class_ini)
-        generate_cycle_forward(self.class_ini)
-        generate_cycle_backward(self.class_ini)
-        generate_toggle_workspace()
-        generate_space_cycle_forward()
-        generate_click_cycle()
-        self._show_status("✅ All scripts generated")
+        changed = generate_all_scripts(self.class_ini, rename_script_workspace())
+        if changed:
+            self._show_status(f"✅ All scripts generated ({len(changed)} updated)")
+        else:
+            self._show_status("✅ All scripts up to date")
 
     def _open_script_folder(self):
-        try:
-            run_cmd(['xdg-open', str(SCRIPT_DIR)])
+        if QtCore.QProcess.startDetached('xdg-open', [str(SCRIPT_DIR)])[0]:
             self._show_status("✅ Folder opened")
-        except:
+        else:
             self._show_status("❌ Cannot open folder")
 
     def _quick_rename(self):
-        generate_rename_script(self.class_ini)
-        result = run_cmd([str(RENAME_SCRIPT)])
-        if result[2] == 0:
-            self.tray.showMessage("Dofus Manager", "Windows renamed!", 1)
+        generate_rename_script(self.class_ini, rename_script_workspace())
+        class_ini = list(self.class_ini)
+        jobs = configured_jobs(self.config)
+        self.tasks.submit('rename', lambda task: rename_windows(
+            class_ini, self.window_index, muter=self.muter,
+            progress=task.report, cancelled=lambda: task.cancelled, jobs=jobs))
+
+    def _on_reorder_clicked(self):
+        # While a reorganize runs the button cancels it
+        if self.tasks.is_running('reorganize'):
+            self.tasks.cancel('reorganize')
+            self.status_label.setText("⏹ Cancelling...")
+            return
+        self._quick_reorganize()
 
     def _quick_reorganize(self):
         generate_reorganize_script(self.class_ini)
-        result = run_cmd([str(REORGANIZE_SCRIPT)], timeout=10)
-        if result[2] == 0:
-            self._show_status("✅ Windows reordered")
+        class_ini = list(self.class_ini)
+        method = self.config.get('reorganize_method', 'auto')
+        jobs = configured_jobs(self.config)
+        self.tasks.submit('reorganize', lambda task: reorganize_windows(
+            class_ini, self.window_index, method=method,
+            progress=task.report, cancelled=lambda: task.cancelled, jobs=jobs))
+        self.btn_reorder.setText("⏹ Annuler")
+
+    # === BACKGROUND TASKS ===
+    def _on_task_progress(self, name, message):
+        self.status_label.setText(message)
+
+    def _on_task_finished(self, name, result):
+        if name == 'rename':
+            # The log (with the time saved by parallel renames) stays available on hover
+            self.status_label.setToolTip('\n'.join(result))
+            self._show_status("✅ Windows renamed")
+            if self.isHidden():
+                self.tray.showMessage("Dofus Manager", "Windows renamed!", 1)
+        elif name == 'reorganize':
+            self._on_reorganize_finished(result)
+        elif name == 'activation':
+            self._on_activation_probed(result)
+
+    def _on_task_failed(self, name, error):
+        if name == 'reorganize' and not self.tasks.is_running('reorganize'):
+            self.btn_reorder.setText("🔄 Réorganiser Fenêtres")
+        self._show_status(f"❌ {name.capitalize()} failed: {error}", 4000)
+
+    def _on_reorganize_finished(self, report):
+        if not self.tasks.is_running('reorganize'):
+            self.btn_reorder.setText("🔄 Réorganiser Fenêtres")
+        # Per-step timings stay available on hover to spot a slow window manager
+        self.status_label.setToolTip(report.format())
+        if report.cancelled:
+            self._show_status("⏹ Reorganize cancelled")
+        elif report.timeouts:
+            self._show_status(f"⚠️ Reordered, {len(report.timeouts)} step(s) timed out", 4000)
+        elif not report.moved:
+            self._show_status("✅ Windows already in order")
+        else:
+            self._show_status(f"✅ {len(report.moved)} window(s) moved ({report.total * 1000:.0f} ms)")
 
     def _show_rename_dialog(self):
         dialog = QtWidgets.QDialog(self)
@@ -655,11 +921,30 @@ Gérez et organisez efficacement vos fenêtres Dofus.
         self.combo_workspace = QtWidgets.QComboBox()
         self.combo_workspace.setEnabled(False)
         self.combo_workspace.setFixedHeight(32)
-        for ws_num, ws_name in get_workspaces():
-            self.combo_workspace.addItem(f"{ws_num}: {ws_name}", ws_num)
+        if not self.window_index.live:
+            self.window_index.refresh()
+        # Names, current desktop and Dofus counts all come from the index cache
+        topology = self.window_index.topology()
+        for num, name in enumerate(topology.names):
+            current = " •" if num == topology.current else ""
+            count = topology.dofus.get(num, 0)
+            self.combo_workspace.addItem(f"{num}: {name} ({count} Dofus){current}", str(num))
+        if topology.current is not None and topology.current < len(topology.names):
+            self.combo_workspace.setCurrentIndex(topology.current)
         layout.addWidget(self.combo_workspace)
 
-        self.radio_specific.toggled.connect(lambda checked: self.combo_workspace.setEnabled(checked))
+        self.check_desktop_order = QtWidgets.QCheckBox("Mémoriser l'ordre actuel pour cet espace")
+        self.check_desktop_order.setEnabled(False)
+        layout.addWidget(self.check_desktop_order)
+
+        # Clients keep their name across renames; this starts over from the list order
+        self.check_reset_names = QtWidgets.QCheckBox("Réattribuer tous les noms dans l'ordre")
+        layout.addWidget(self.check_reset_names)
+
+        def on_specific(checked):
+            self.combo_workspace.setEnabled(checked)
+            self.check_desktop_order.setEnabled(checked)
+        self.radio_specific.toggled.connect(on_specific)
 
         layout.addSpacing(12)
 
@@ -681,12 +966,21 @@ Gérez et organisez efficacement vos fenêtres Dofus.
     def _execute_rename(self, dialog):
         workspace = None
         if self.radio_specific.isChecked():
-            workspace = self.combo_workspace.currentData()
-        
-        generate_rename_script(self.class_ini, workspace)
-        result = run_cmd([str(RENAME_SCRIPT)])
-        if result[2] == 0:
-            self._show_status("✅ Windows renamed")
-            dialog.accept()
-        else:
-            self._show_status("❌ Rename failed")
\ No newline at end of file
+            workspace = int(self.combo_workspace.currentData())
+            if self.check_desktop_order.isChecked():
+                # This desktop keeps its own order, even after the main list changes
+                by_desktop = dict(self.config.get('class_ini_by_desktop') or {})
+                by_desktop[str(workspace)] = list(self.class_ini)
+                self.config['class_ini_by_desktop'] = by_desktop
+                self._save_config()
+
+        # The chosen desktop is for this rename only: the hotkey script keeps its default
+        generate_rename_script(self.class_ini, rename_script_workspace(),
+                               self.config.get('class_ini_by_desktop') or {})
+        class_ini = self._class_list_for(workspace)
+        reset = self.check_reset_names.isChecked()
+        jobs = configured_jobs(self.config)
+        self.tasks.submit('rename', lambda task: rename_windows(
+            class_ini, self.window_index, muter=self.muter, progress=task.report,
+            cancelled=lambda: task.cancelled, desktop=workspace, reset=reset, jobs=jobs))
+        dialog.accept()
@@ -0,0 +1,93 @@
+"""
+Background execution for the GUI.
+Blocking actions run on a small worker pool and report back through Qt signals,
+so the window and the tray menu stay responsive.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6 import QtCore
+
+
+class Task:
+    """Handle passed to a running job for progress reports and cancellation"""
+
+    def __init__(self, runner, name):
+        self.name = name
+        self._runner = runner
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def report(self, message):
+        """Safe to call from the worker thread: delivered on the GUI thread"""
+        self._runner.progress.emit(self.name, message)
+
+
+class TaskRunner(QtCore.QObject):
+    """
+    Named background jobs. Only one job per name runs at a time; submitting a
+    name that is already running coalesces every extra request into one rerun
+    with the latest arguments once the current run ends.
+    """
+    progress = QtCore.pyqtSignal(str, str)
+    finished = QtCore.pyqtSignal(str, object)
+    failed = QtCore.pyqtSignal(str, str)
+    _done = QtCore.pyqtSignal(str, object, object)
+
+    def __init__(self, parent=None, workers=2):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dofus-task')
+        self._tasks = {}
+        self._pending = {}
+        self._done.connect(self._on_done)
+
+    def is_running(self, name):
+        return name in self._tasks
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Run fn(task, *args, **kwargs) in the background; False if coalesced"""
+        if name in self._tasks:
+            self._pending[name] = (fn, args, kwargs)
+            return False
+        task = Task(self, name)
+        self._tasks[name] = task
+        self._pool.submit(self._run, task, fn, args, kwargs)
+        return True
+
+    def cancel(self, name):
+        self._pending.pop(name, None)
+        task = self._tasks.get(name)
+        if task:
+            task.cancel()
+
+    def shutdown(self):
+        for name in list(self._tasks):
+            self.cancel(name)
+        self._pool.shutdown(wait=False)
+
+    def _run(self, task, fn, args, kwargs):
+        try:
+            result = fn(task, *args, **kwargs)
+        except Exception as e:
+            self._done.emit(task.name, None, str(e) or e.__class__.__name__)
+        else:
+            self._done.emit(task.name, result, None)
+
+    def _on_done(self, name, result, error):
+        self._tasks.pop(name, None)
+        # Start the coalesced rerun first so handlers see the job as still running
+        pending = self._pending.pop(name, None)
+        if pending:
+            fn, args, kwargs = pending
+            self.submit(name, fn, *args, **kwargs)
+        if error is None:
+            self.finished.emit(name, result)
+        else:
+            self.failed.emit(name, error)
@@ -2,24 +2,137 @@ from PyQt6 import QtWidgets, QtCore, QtGui
 from PyQt6.QtCore import Qt
 
 
-class CompactDraggableList(QtWidgets.QListWidget):
+class InitiativeModel(QtCore.QAbstractListModel):
     """
-    Compact draggable list widget with clean styling.
-    Supports drag & drop reordering with visual feedback.
+    Initiative order as a list model.
+    Every mutation emits the matching row signal, so views only relayout
+    the rows that changed; numbering is left to the delegate.
     """
     orderChanged = QtCore.pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, classes=None, parent=None):
+        super().__init__(parent)
+        self._classes = list(classes or [])
+
+    @property
+    def classes(self):
+        return list(self._classes)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._classes)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._classes):
+            return None
+        name = self._classes[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole):
+            return name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            # Only computed when Qt actually shows a tooltip
+            return f"<b>{name}</b><br>Position: {index.row() + 1}<br><i>Drag to reorder</i>"
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def set_classes(self, classes):
+        """Replace the whole list (profile load, reset)"""
+        classes = list(classes)
+        if classes == self._classes:
+            return
+        self.beginResetModel()
+        self._classes = classes
+        self.endResetModel()
+
+    def append(self, name):
+        row = len(self._classes)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._classes.append(name)
+        self.endInsertRows()
+
+    def rename(self, row, name):
+        self._classes[row] = name
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove(self, row):
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        name = self._classes.pop(row)
+        self.endRemoveRows()
+        return name
+
+    def move(self, row, dest):
+        """Move row so it lands before the current row dest; False if nothing moved"""
+        if not self.beginMoveRows(QtCore.QModelIndex(), row, row, QtCore.QModelIndex(), dest):
+            return False
+        name = self._classes.pop(row)
+        self._classes.insert(dest - 1 if dest > row else dest, name)
+        self.endMoveRows()
+        self.orderChanged.emit()
+        return True
+
+
+class InitiativeDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints a row as a numbered card; the number comes from the row at paint time"""
+    ROW_HEIGHT = 44
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        selected = bool(option.state & QtWidgets.QStyle.StateFlag.State_Selected)
+        hovered = bool(option.state & QtWidgets.QStyle.StateFlag.State_MouseOver)
+        if selected:
+            background, border = ('#0e8489', '#1dd1bb') if hovered else ('#0d7377', '#14b8a6')
+        else:
+            background, border = ('#353535', '#666666') if hovered else ('#2b2b2b', '#444444')
+
+        rect = option.rect.adjusted(0, 3, 0, -3)
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QtGui.QColor(background))
+        painter.drawRoundedRect(QtCore.QRectF(rect), 5, 5)
+        painter.setBrush(QtGui.QColor(border))
+        painter.drawRect(QtCore.QRect(rect.left(), rect.top(), 3, rect.height()))
+
+        font = QtGui.QFont(option.font)
+        font.setWeight(QtGui.QFont.Weight.DemiBold if selected else QtGui.QFont.Weight.Medium)
+        painter.setFont(font)
+        painter.setPen(QtGui.QColor('#ffffff'))
+        painter.drawText(rect.adjusted(13, 0, -10, 0),
+                         Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                         f"{index.row() + 1}. {index.data()}")
+        painter.restore()
+
+
+class CompactDraggableList(QtWidgets.QListView):
+    """
+    Compact draggable view of an InitiativeModel with clean styling.
+    A drop becomes a single InitiativeModel.move(), so only the rows between
+    the old and new position are relaid out.
+    """
+
+    def __init__(self, model=None):
         super().__init__()
-        
+
         # Enable internal drag & drop
         self.setDragDropMode(QtWidgets.QAbstractItemView.DragDropMode.InternalMove)
         self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setDragDropOverwriteMode(False)
+        self.setDropIndicatorShown(True)
         self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
-        
-        # Clean, readable styling
+        self.setUniformItemSizes(True)
+        self.setItemDelegate(InitiativeDelegate(self))
+
+        # Rows are painted by the delegate; only the frame is styled here
         self.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #1e1e1e;
                 color: #ffffff;
                 border: 2px solid #333333;
@@ -29,52 +142,48 @@ class CompactDraggableList(QtWidgets.QListWidget):
                 font-weight: 500;
                 outline: none;
             }
-            QListWidget::item {
-                padding: 12px 10px;
-                margin: 3px 0;
-                border-radius: 5px;
-                background-color: #2b2b2b;
-                border-left: 3px solid #444444;
-            }
-            QListWidget::item:selected {
-                background-color: #0d7377;
-                border-left: 3px solid #14b8a6;
-                color: #ffffff;
-                font-weight: 600;
-            }
-            QListWidget::item:hover {
-                background-color: #353535;
-                border-left: 3px solid #666666;
-            }
-            QListWidget::item:selected:hover {
-                background-color: #0e8489;
-                border-left: 3px solid #1dd1bb;
-            }
         """)
-        
-        # Spacing for visual clarity
-        self.setSpacing(3)
-        
-        # Enable tooltips on hover
+
+        # Hover highlight
         self.setMouseTracking(True)
 
+        if model is not None:
+            self.setModel(model)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
     def dropEvent(self, event):
-        """Handle drop event and signal order change"""
-        super().dropEvent(event)
-        self.orderChanged.emit()
+        """Turn an internal drop into one model move"""
+        if event.source() is not self or self.model() is None:
+            event.ignore()
+            return
+        row = self.currentRow()
+        pos = event.position().toPoint()
+        target = self.indexAt(pos)
+        if target.isValid():
+            rect = self.visualRect(target)
+            dest = target.row() + (1 if pos.y() > rect.center().y() else 0)
+        else:
+            dest = self.model().rowCount()
+        if row >= 0 and self.model().move(row, dest):
+            self.setCurrentIndex(self.model().index(dest - 1 if dest > row else dest))
+        # The rows were already moved: keep the drag from removing the source
+        event.setDropAction(Qt.DropAction.IgnoreAction)
+        event.accept()
+        self.stopAutoScroll()
+        self.setState(QtWidgets.QAbstractItemView.State.NoState)
+        # Renumbered rows and the drop indicator (at dest) all lie between row and dest
+        self._update_rows(*sorted((row if row >= 0 else dest, dest)))
 
-    def mouseMoveEvent(self, event):
-        """Display tooltip with class details on hover"""
-        super().mouseMoveEvent(event)
-        item = self.itemAt(event.pos())
-        if item:
-            # Extract class name from numbered item text
-            text = item.text()
-            if '. ' in text:
-                class_name = text.split('. ', 1)[1]
-                position = self.row(item) + 1
-                item.setToolTip(
-                    f"<b>{class_name}</b><br>"
-                    f"Position: {position}<br>"
-                    f"<i>Drag to reorder</i>"
-                )
\ No newline at end of file
+    def _update_rows(self, first, last):
+        """Repaint rows first..last (clamped) and the row boundaries around them"""
+        model = self.model()
+        last = min(last, model.rowCount() - 1)
+        first = max(min(first, last), 0)
+        if last < 0:
+            return
+        rect = self.visualRect(model.index(first)).united(self.visualRect(model.index(last)))
+        # The drop indicator is drawn on the boundary, partly outside the rows
+        self.viewport().update(rect.adjusted(0, -2, 0, 2))